@@ -0,0 +1,280 @@
+"""Offline benchmarks for the Google Maps MCP tools.
+
+Runs every tool against an in-process stand-in for the Maps web services
+(an httpx.MockTransport) with configurable latency, error and payload
+profiles, and reports throughput, latency percentiles and allocations.
+No API key or network access is needed.
+
+    uv run benchmark.py --iterations 200 --latency-ms 40 --error-rate 0.05
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import time
+import tracemalloc
+from typing import Any, Awaitable, Callable, Dict, List
+
+# The server reads its configuration at import time
+os.environ.setdefault("GOOGLE_MAPS_API_KEY", "benchmark")
+os.environ.setdefault("GOOGLE_MAPS_RETRY_BASE_DELAY", "0.01")
+os.environ.setdefault("GOOGLE_MAPS_RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("GOOGLE_MAPS_SEARCH_PAGE_TOKEN_DELAY", "0")
+
+import httpx
+
+import google_maps
+
+# FastMCP enables INFO logging on import, which makes httpx log every mocked
+# request; keep that formatting out of the timed section
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+# Number of results, reviews and padding characters per response
+PAYLOAD_PROFILES = {
+    "small": {"results": 1, "reviews": 0, "padding": 0},
+    "medium": {"results": 5, "reviews": 3, "padding": 200},
+    "large": {"results": 20, "reviews": 5, "padding": 2000},
+}
+
+class FakeGoogleMaps:
+    """Stand-in for the Maps web services with synthetic, deterministic payloads."""
+    
+    def __init__(self, latency_ms: float, jitter_ms: float, error_rate: float, payload: str, seed: int):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.profile = PAYLOAD_PROFILES[payload]
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+    
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        await asyncio.sleep(max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter)))
+        
+        if self.random.random() < self.error_rate:
+            self.errors += 1
+            if self.random.random() < 0.5:
+                return httpx.Response(503, headers={"Retry-After": "0"})
+            return httpx.Response(200, json={"status": "OVER_QUERY_LIMIT"})
+        
+        endpoint = request.url.path.split("/maps/api/", 1)[1]
+        params = dict(request.url.params)
+        body = getattr(self, "_" + endpoint.replace("/", "_").removesuffix("_json"))(params)
+        return httpx.Response(200, json={"status": "OK", **body})
+    
+    def _place(self, i: int) -> Dict[str, Any]:
+        return {
+            "name": f"Place {i}",
+            "formatted_address": f"{i} Main Street, Springfield" + " " * self.profile["padding"],
+            "place_id": f"place-{i}",
+            "rating": 4.2,
+            "types": ["restaurant", "food", "point_of_interest"],
+            "geometry": {"location": {"lat": 37.0 + i / 1000, "lng": -122.0 - i / 1000}},
+        }
+    
+    def _geocode(self, params: Dict[str, str]) -> Dict[str, Any]:
+        return {"results": [self._place(i) for i in range(self.profile["results"])]}
+    
+    def _place_textsearch(self, params: Dict[str, str]) -> Dict[str, Any]:
+        return {"results": [self._place(i) for i in range(max(self.profile["results"], 5))]}
+    
+    def _place_details(self, params: Dict[str, str]) -> Dict[str, Any]:
+        place = self._place(0)
+        place.update({
+            "formatted_phone_number": "(555) 555-0100",
+            "website": "https://example.com",
+            "opening_hours": {"open_now": True, "weekday_text": [f"Day {d}: 9:00 AM - 5:00 PM" for d in range(7)]},
+            "reviews": [
+                {"author_name": f"Reviewer {r}", "rating": 5, "text": "Great place. " * 40}
+                for r in range(self.profile["reviews"])
+            ],
+        })
+        return {"result": place}
+    
+    def _directions(self, params: Dict[str, str]) -> Dict[str, Any]:
+        steps = [
+            {
+                "html_instructions": f"Turn <b>left</b> onto <b>Street {s}</b>",
+                "distance": {"text": "0.5 km", "value": 500},
+                "duration": {"text": "1 min", "value": 60},
+            }
+            for s in range(15)
+        ]
+        leg = {"distance": {"text": "7.5 km", "value": 7500}, "duration": {"text": "15 mins", "value": 900}, "steps": steps}
+        return {"routes": [{"summary": "Main St", "legs": [leg]}]}
+    
+    def _distancematrix(self, params: Dict[str, str]) -> Dict[str, Any]:
+        origins = params["origins"].split("|")
+        destinations = params["destinations"].split("|")
+        element = {"status": "OK", "distance": {"text": "12.3 km", "value": 12300}, "duration": {"text": "18 mins", "value": 1080}}
+        return {
+            "origin_addresses": origins,
+            "destination_addresses": destinations,
+            "rows": [{"elements": [element] * len(destinations)} for _ in origins],
+        }
+    
+    def _elevation(self, params: Dict[str, str]) -> Dict[str, Any]:
+        locations = params["locations"]
+        if locations.startswith("enc:"):
+            points = google_maps.decode_polyline(locations[4:])
+        else:
+            points = [tuple(map(float, point.split(","))) for point in locations.split("|")]
+        return {
+            "results": [
+                {"location": {"lat": lat, "lng": lng}, "elevation": 100.0 + lat, "resolution": 4.77}
+                for lat, lng in points
+            ]
+        }
+
+def tool_calls(args: argparse.Namespace) -> Dict[str, Callable[[int], Awaitable[str]]]:
+    """One call factory per tool; the iteration number varies inputs so caches can be exercised."""
+    matrix = args.matrix_size
+    points = args.elevation_points
+    return {
+        "geocode_address": lambda i: google_maps.geocode_address(f"{i % args.distinct} Main Street"),
+        "batch_geocode": lambda i: google_maps.batch_geocode([f"{i % args.distinct} Main Street {n}" for n in range(args.batch_size)]),
+        "reverse_geocode": lambda i: google_maps.reverse_geocode(37.0 + (i % args.distinct) / 100, -122.0),
+        "batch_reverse_geocode": lambda i: google_maps.batch_reverse_geocode(
+            [{"lat": 37.0 + (i % args.distinct) / 100 + n / 1000, "lng": -122.0} for n in range(args.batch_size)]
+        ),
+        "search_places": lambda i: google_maps.search_places(f"pizza {i % args.distinct}"),
+        "get_place_details": lambda i: google_maps.get_place_details(f"place-{i % args.distinct}"),
+        "batch_get_place_details": lambda i: google_maps.batch_get_place_details(
+            [f"place-{i % args.distinct}-{n}" for n in range(args.batch_size)]
+        ),
+        "get_directions": lambda i: google_maps.get_directions(f"{i % args.distinct} Main Street", "Airport"),
+        "calculate_distance_matrix": lambda i: google_maps.calculate_distance_matrix(
+            [f"Origin {i % args.distinct}-{n}" for n in range(matrix)],
+            [f"Destination {n}" for n in range(matrix)],
+        ),
+        "get_elevation": lambda i: google_maps.get_elevation(
+            [{"lat": 37.0 + (i % args.distinct) / 10 + n / 10000, "lng": -122.0 + n / 10000} for n in range(points)]
+        ),
+    }
+
+def reset_caches() -> None:
+    for cache in (
+        google_maps._geocode_cache,
+        google_maps._reverse_geocode_cache,
+        google_maps._place_details_cache,
+        google_maps._search_page_cache,
+        google_maps._elevation_cache,
+        google_maps._distance_matrix_cache,
+    ):
+        cache.clear()
+    google_maps.metrics.clear()
+
+def percentile(values: List[float], q: float) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+async def benchmark_tool(
+    name: str,
+    call: Callable[[int], Awaitable[str]],
+    fake: FakeGoogleMaps,
+    args: argparse.Namespace
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(args.concurrency)
+    
+    async def timed(i: int) -> None:
+        async with semaphore:
+            if not args.warm:
+                reset_caches()
+            started = time.perf_counter()
+            await call(i)
+            latencies.append(time.perf_counter() - started)
+    
+    requests_before = fake.requests
+    started = time.perf_counter()
+    await asyncio.gather(*(timed(i) for i in range(args.iterations)))
+    elapsed = time.perf_counter() - started
+    upstream_requests = fake.requests - requests_before
+    
+    # Allocation pass, kept separate so tracing does not skew the latencies
+    allocation_calls = min(args.iterations, args.allocation_iterations)
+    peaks = []
+    if allocation_calls:
+        tracemalloc.start()
+        for i in range(allocation_calls):
+            if not args.warm:
+                reset_caches()
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            await call(i)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+        tracemalloc.stop()
+    
+    latencies_ms = [latency * 1000 for latency in latencies]
+    return {
+        "tool": name,
+        "calls": args.iterations,
+        "upstream_requests": upstream_requests,
+        "throughput": args.iterations / elapsed,
+        "p50_ms": percentile(latencies_ms, 50),
+        "p95_ms": percentile(latencies_ms, 95),
+        "p99_ms": percentile(latencies_ms, 99),
+        "peak_alloc_kib": statistics.mean(peaks) / 1024 if peaks else None,
+    }
+
+async def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    fake = FakeGoogleMaps(args.latency_ms, args.jitter_ms, args.error_rate, args.payload, args.seed)
+    google_maps._http_client = httpx.AsyncClient(transport=httpx.MockTransport(fake.handle))
+    calls = tool_calls(args)
+    selected = args.tools or list(calls)
+    
+    results = []
+    try:
+        for name in selected:
+            results.append(await benchmark_tool(name, calls[name], fake, args))
+    finally:
+        await google_maps.close_http_client()
+    return results
+
+def print_report(results: List[Dict[str, Any]]) -> None:
+    header = f"{'tool':<26} {'calls':>6} {'upstream':>8} {'calls/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'peak KiB':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        peak = f"{r['peak_alloc_kib']:.1f}" if r["peak_alloc_kib"] is not None else "-"
+        print(
+            f"{r['tool']:<26} {r['calls']:>6} {r['upstream_requests']:>8} {r['throughput']:>9.1f} "
+            f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {peak:>9}"
+        )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the Google Maps MCP tools against a local fake")
+    parser.add_argument("--tools", nargs="*", help="Tools to run (default: all)")
+    parser.add_argument("--iterations", type=int, default=100, help="Calls per tool")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent calls per tool")
+    parser.add_argument("--distinct", type=int, default=1000000, help="Distinct inputs per tool; lower it to exercise caches")
+    parser.add_argument("--warm", action="store_true", help="Keep caches between calls instead of clearing them")
+    parser.add_argument("--latency-ms", type=float, default=30.0, help="Simulated upstream latency")
+    parser.add_argument("--jitter-ms", type=float, default=10.0, help="Uniform jitter around the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of transient upstream errors")
+    parser.add_argument("--payload", choices=sorted(PAYLOAD_PROFILES), default="medium")
+    parser.add_argument("--batch-size", type=int, default=25, help="Inputs per batch tool call")
+    parser.add_argument("--matrix-size", type=int, default=10, help="Origins and destinations per matrix")
+    parser.add_argument("--elevation-points", type=int, default=500, help="Locations per elevation call")
+    parser.add_argument("--allocation-iterations", type=int, default=10, help="Calls traced for allocations (0 disables)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+    
+    unknown = set(args.tools or []) - set(tool_calls(args))
+    if unknown:
+        parser.error(f"unknown tools: {', '.join(sorted(unknown))}")
+    
+    results = asyncio.run(run(args))
+    print_report(results)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,32 @@
+import argparse
+import asyncio
+import base64
+import binascii
+import contextvars
+import csv
+import functools
+import hashlib
+import io
+import itertools
+import json
+import math
 import os
-from typing import Any, Dict, List, Optional
+import random
+import re
+import signal
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Literal, Optional
+from urllib.parse import quote, urlencode
 import httpx
-from mcp.server.fastmcp import FastMCP
-
-# Initialize FastMCP server
-mcp = FastMCP("google-maps")
+from mcp.server.fastmcp import Context, FastMCP
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
 
 # Get API key from environment
 GOOGLE_MAPS_API_KEY = os.getenv("GOOGLE_MAPS_API_KEY")
@@ -14,76 +36,1674 @@ if not GOOGLE_MAPS_API_KEY:
 # Base URL for Google Maps APIs
 GOOGLE_MAPS_BASE_URL = "https://maps.googleapis.com/maps/api"
 
-async def make_google_request(endpoint: str, params: Dict[str, Any]) -> Dict[str, Any] | None:
-    """Make a request to Google Maps API with proper error handling."""
+# Connection pool settings for the shared HTTP client
+HTTP_TIMEOUT = float(os.getenv("GOOGLE_MAPS_HTTP_TIMEOUT", "30"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("GOOGLE_MAPS_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("GOOGLE_MAPS_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("GOOGLE_MAPS_KEEPALIVE_EXPIRY", "60"))
+HTTP2_ENABLED = os.getenv("GOOGLE_MAPS_HTTP2", "false").lower() in ("1", "true", "yes")
+
+if HTTP2_ENABLED:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        print("GOOGLE_MAPS_HTTP2 is set but the 'h2' package is not installed; using HTTP/1.1", file=sys.stderr)
+        HTTP2_ENABLED = False
+
+_http_client: httpx.AsyncClient | None = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the process-wide HTTP client, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=HTTP2_ENABLED,
+            timeout=HTTP_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+    return _http_client
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client and release its pooled connections."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+# Sessions currently inside the lifespan. Over stdio there is exactly one;
+# the HTTP transports enter the lifespan once per client session, so shared
+# resources are released only when the last session ends.
+_active_sessions = 0
+
+@asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """Open the shared HTTP client when the server starts; close it and the disk cache on shutdown."""
+    global _active_sessions
+    _active_sessions += 1
+    get_http_client()
+    try:
+        yield
+    finally:
+        _active_sessions -= 1
+        if _active_sessions == 0:
+            await close_http_client()
+            if _daemon_client is not None:
+                await _daemon_client.close()
+            if _disk_cache is not None:
+                await asyncio.to_thread(_disk_cache.close)
+
+# Initialize FastMCP server
+mcp = FastMCP("google-maps", lifespan=lifespan)
+
+# Histogram bucket bounds in seconds, from cache hits to slow retried calls
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class Metrics:
+    """Process-wide counters and latency histograms, exported in Prometheus text format."""
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._help: Dict[str, tuple[str, str]] = {}
+        self._counters: Dict[tuple[str, tuple], float] = {}
+        self._histograms: Dict[tuple[str, tuple], List[float]] = {}
+
+    def describe(self, name: str, kind: str, help_text: str) -> None:
+        self._help[name] = (kind, help_text)
+
+    def inc(self, name: str, labels: Dict[str, str] | None = None, value: float = 1) -> None:
+        key = (name, tuple(sorted((labels or {}).items())))
+        self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, labels: Dict[str, str] | None = None) -> None:
+        key = (name, tuple(sorted((labels or {}).items())))
+        series = self._histograms.get(key)
+        if series is None:
+            # One integer count per bucket, then +Inf, then the float sum
+            series = self._histograms[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+                break
+        else:
+            series[len(self.buckets)] += 1
+        series[-1] += value
+
+    def value(self, name: str, labels: Dict[str, str] | None = None) -> float:
+        return self._counters.get((name, tuple(sorted((labels or {}).items()))), 0)
+
+    def clear(self) -> None:
+        self._counters.clear()
+        self._histograms.clear()
+
+    @staticmethod
+    def _format(value: float) -> str:
+        # Exact output: counts stay integers and floats keep full precision,
+        # so large counters do not lose increments to rounding
+        return str(value) if isinstance(value, int) else repr(float(value))
+
+    @staticmethod
+    def _labels(labels: Iterable[tuple[str, str]]) -> str:
+        parts = []
+        for name, value in labels:
+            value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            parts.append(f'{name}="{value}"')
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def render(self) -> str:
+        lines = []
+        names = sorted({name for name, _ in self._counters} | {name for name, _ in self._histograms})
+        for name in names:
+            kind, help_text = self._help.get(name, ("untyped", name))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (series_name, labels), value in sorted(self._counters.items()):
+                if series_name == name:
+                    lines.append(f"{name}{self._labels(labels)} {self._format(value)}")
+            for (series_name, labels), series in sorted(self._histograms.items()):
+                if series_name != name:
+                    continue
+                count = 0
+                for bound, hits in zip(self.buckets + (math.inf,), series):
+                    count += hits
+                    le = "+Inf" if bound == math.inf else f"{bound:g}"
+                    lines.append(f"{name}_bucket{self._labels(labels + (('le', le),))} {self._format(count)}")
+                lines.append(f"{name}_sum{self._labels(labels)} {self._format(series[-1])}")
+                lines.append(f"{name}_count{self._labels(labels)} {self._format(count)}")
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+metrics.describe("google_maps_tool_calls_total", "counter", "MCP tool invocations by result (ok, error, exception, cancelled).")
+metrics.describe("google_maps_tool_errors_total", "counter", "MCP tool invocations that returned an error or raised.")
+metrics.describe("google_maps_tool_latency_seconds", "histogram", "MCP tool call latency.")
+metrics.describe("google_maps_upstream_requests_total", "counter", "Google Maps HTTP attempts by endpoint, tool and outcome status.")
+metrics.describe("google_maps_upstream_latency_seconds", "histogram", "Google Maps HTTP attempt latency.")
+metrics.describe("google_maps_upstream_retries_total", "counter", "Google Maps attempts that were retried.")
+metrics.describe("google_maps_rate_limit_wait_seconds", "histogram", "Time spent queued on the client-side rate limiter, by endpoint and tool.")
+metrics.describe("google_maps_coalesced_requests_total", "counter", "Requests that joined an identical in-flight request.")
+metrics.describe("google_maps_cache_requests_total", "counter", "Cache lookups by cache and result.")
+metrics.describe("google_maps_details_prefetch_total", "counter", "Speculative place details prefetches by result.")
+
+# Tool currently being served, used to label upstream requests
+_current_tool: contextvars.ContextVar[str] = contextvars.ContextVar("current_tool", default="none")
+# Set by render_error() so tools that report failures as results count as errors
+_tool_failed: contextvars.ContextVar[bool] = contextvars.ContextVar("tool_failed", default=False)
+
+class RetryBudget:
+    """Backoff seconds a tool call may still spend retrying, shared by all of its requests."""
+    
+    def __init__(self, seconds: float):
+        self.remaining = seconds
+    
+    def spend(self, seconds: float) -> bool:
+        """Take `seconds` from the budget if enough is left."""
+        if seconds > self.remaining:
+            return False
+        self.remaining -= seconds
+        return True
+
+# Retry budget of the current tool call, set by instrumented()
+_retry_budget: contextvars.ContextVar[RetryBudget | None] = contextvars.ContextVar("retry_budget", default=None)
+
+def instrumented(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Record call count, errors and latency for an MCP tool, and start its retry budget."""
+    name = func.__name__
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        token = _current_tool.set(name)
+        failed_token = _tool_failed.set(False)
+        budget_token = _retry_budget.set(RetryBudget(RETRY_MAX_ELAPSED))
+        started = time.monotonic()
+        result = "exception"
+        try:
+            response = await func(*args, **kwargs)
+            result = "error" if _tool_failed.get() else "ok"
+            return response
+        except asyncio.CancelledError:
+            result = "cancelled"
+            raise
+        finally:
+            labels = {"tool": name}
+            metrics.inc("google_maps_tool_calls_total", {**labels, "result": result})
+            if result in ("error", "exception"):
+                metrics.inc("google_maps_tool_errors_total", labels)
+            metrics.observe("google_maps_tool_latency_seconds", time.monotonic() - started, labels)
+            _retry_budget.reset(budget_token)
+            _tool_failed.reset(failed_token)
+            _current_tool.reset(token)
+    return wrapper
+
+def record_cache(cache: str, hit: bool) -> None:
+    metrics.inc("google_maps_cache_requests_total", {"cache": cache, "result": "hit" if hit else "miss"})
+
+# Retry settings for transient Google Maps failures
+RETRY_MAX_ATTEMPTS = int(os.getenv("GOOGLE_MAPS_RETRY_MAX_ATTEMPTS", "5"))
+RETRY_BASE_DELAY = float(os.getenv("GOOGLE_MAPS_RETRY_BASE_DELAY", "0.5"))
+RETRY_MAX_DELAY = float(os.getenv("GOOGLE_MAPS_RETRY_MAX_DELAY", "8"))
+RETRY_MAX_ELAPSED = float(os.getenv("GOOGLE_MAPS_RETRY_MAX_ELAPSED", "20"))
+
+# Google statuses that may succeed if the same request is sent again
+RETRYABLE_GOOGLE_STATUSES = {"OVER_QUERY_LIMIT", "UNKNOWN_ERROR"}
+RETRYABLE_HTTP_STATUSES = {429, 500, 502, 503, 504}
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header given either in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt: int, retry_after: float | None = None) -> float:
+    """Exponential backoff with full jitter, never shorter than Retry-After."""
+    delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+# Client-side rate limits per endpoint as (requests/sec, elements/sec).
+# Defaults approximate Google's standard quotas; override with
+# GOOGLE_MAPS_RATE_LIMITS="distancematrix/json=20:500,geocode/json=10".
+RATE_LIMIT_ENABLED = os.getenv("GOOGLE_MAPS_RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+ENDPOINT_RATE_LIMITS: Dict[str, tuple[float, float | None]] = {
+    "geocode/json": (50.0, None),
+    "place/textsearch/json": (10.0, None),
+    "place/details/json": (10.0, None),
+    "directions/json": (50.0, None),
+    "distancematrix/json": (50.0, 1000.0),
+    "elevation/json": (50.0, 5000.0),
+}
+for _entry in filter(None, os.getenv("GOOGLE_MAPS_RATE_LIMITS", "").split(",")):
+    _endpoint, _, _limits = _entry.strip().partition("=")
+    _qps, _, _eps = _limits.partition(":")
+    ENDPOINT_RATE_LIMITS[_endpoint] = (float(_qps), float(_eps) if _eps else None)
+
+class TokenBucket:
+    """Async token bucket that refills at `rate` tokens/sec up to `capacity`."""
+    
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """Wait until `tokens` are available and take them. Returns seconds waited."""
+        # A request larger than the bucket can never fit; let it drain the bucket instead
+        tokens = min(tokens, self.capacity)
+        started = time.monotonic()
+        async with self._lock:
+            self._refill()
+            while self._tokens < tokens:
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= tokens
+        return time.monotonic() - started
+    
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take `tokens` if they are available right now, without waiting."""
+        self._refill()
+        if self._tokens < tokens:
+            return False
+        self._tokens -= tokens
+        return True
+
+_request_buckets: Dict[str, TokenBucket] = {}
+_element_buckets: Dict[str, TokenBucket] = {}
+
+def count_elements(endpoint: str, params: Dict[str, Any]) -> int:
+    """Number of billable elements in a request (origins x destinations, locations)."""
+    if endpoint == "distancematrix/json":
+        return len(str(params.get("origins", "")).split("|")) * len(str(params.get("destinations", "")).split("|"))
+    if endpoint == "elevation/json" and "locations" in params:
+        return len(str(params["locations"]).split("|"))
+    return 1
+
+async def acquire_rate_limit(endpoint: str, elements: int = 1) -> float:
+    """Wait for request and element capacity on `endpoint`. Returns seconds waited."""
+    if not RATE_LIMIT_ENABLED or endpoint not in ENDPOINT_RATE_LIMITS:
+        return 0.0
+    qps, eps = ENDPOINT_RATE_LIMITS[endpoint]
+    if endpoint not in _request_buckets:
+        _request_buckets[endpoint] = TokenBucket(qps)
+    waited = await _request_buckets[endpoint].acquire()
+    if eps:
+        if endpoint not in _element_buckets:
+            _element_buckets[endpoint] = TokenBucket(eps)
+        waited += await _element_buckets[endpoint].acquire(elements)
+    return waited
+
+def request_key(endpoint: str, params: Dict[str, Any]) -> str:
+    """Canonical key for a request: endpoint plus sorted, whitespace-normalized params."""
+    normalized = sorted(
+        (name, re.sub(r"\s+", " ", str(value)).strip())
+        for name, value in params.items()
+        if name != "key"
+    )
+    return f"{endpoint}?{urlencode(normalized)}"
+
+class PersistentCache:
+    """SQLite response cache (WAL mode) that survives server restarts.
+    
+    Blocking sqlite calls run in a worker thread; errors are logged and treated
+    as cache misses so the cache can never fail a request.
+    """
+    
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._writes = 0
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, endpoint TEXT NOT NULL, body TEXT NOT NULL, "
+                "size INTEGER NOT NULL, expires REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+            self._conn = conn
+        return self._conn
+    
+    def _get(self, key: str) -> Any | None:
+        with self._lock:
+            conn = self._connect()
+            now = time.time()
+            row = conn.execute("SELECT body, expires FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            return json.loads(row[0])
+    
+    def _set(self, key: str, endpoint: str, value: Any, ttl: float) -> None:
+        body = json.dumps(value, separators=(",", ":"))
+        with self._lock:
+            conn = self._connect()
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, endpoint, body, len(body), now + ttl, now),
+            )
+            self._writes += 1
+            if self._writes % 100 == 0:
+                self._evict(conn, now)
+    
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """Drop expired rows, then least recently used rows until under max_bytes."""
+        conn.execute("DELETE FROM responses WHERE expires < ?", (now,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        while total > self.max_bytes:
+            rows = conn.execute("SELECT key, size FROM responses ORDER BY accessed LIMIT 100").fetchall()
+            if not rows:
+                break
+            conn.executemany("DELETE FROM responses WHERE key = ?", [(row[0],) for row in rows])
+            total -= sum(row[1] for row in rows)
+    
+    async def get(self, key: str) -> Any | None:
+        try:
+            return await asyncio.to_thread(self._get, key)
+        except sqlite3.Error as e:
+            print(f"Disk cache read failed: {e}", file=sys.stderr)
+            return None
+    
+    async def set(self, key: str, endpoint: str, value: Any, ttl: float) -> None:
+        try:
+            await asyncio.to_thread(self._set, key, endpoint, value, ttl)
+        except sqlite3.Error as e:
+            print(f"Disk cache write failed: {e}", file=sys.stderr)
+    
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+# Optional on-disk cache, enabled by setting GOOGLE_MAPS_CACHE_PATH.
+# TTLs in seconds per endpoint; override with GOOGLE_MAPS_CACHE_TTLS="elevation/json=86400".
+DISK_CACHE_PATH = os.getenv("GOOGLE_MAPS_CACHE_PATH")
+DISK_CACHE_MAX_BYTES = int(os.getenv("GOOGLE_MAPS_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+DISK_CACHE_TTLS: Dict[str, float] = {
+    "geocode/json": 30 * 86400.0,
+    "place/details/json": 86400.0,
+    "elevation/json": 365 * 86400.0,
+}
+for _entry in filter(None, os.getenv("GOOGLE_MAPS_CACHE_TTLS", "").split(",")):
+    _endpoint, _, _ttl = _entry.strip().partition("=")
+    DISK_CACHE_TTLS[_endpoint] = float(_ttl)
+
+_disk_cache = PersistentCache(DISK_CACHE_PATH, DISK_CACHE_MAX_BYTES) if DISK_CACHE_PATH else None
+
+class CassetteStore:
+    """Recorded Google Maps responses on disk, one JSON file per request_key().
+    
+    Keys never include the API key, so cassettes are safe to share.
+    """
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+    
+    def _path(self, key: str) -> str:
+        endpoint = key.partition("?")[0].replace("/", "_")
+        return os.path.join(self.directory, endpoint, hashlib.sha256(key.encode()).hexdigest() + ".json")
+    
+    def _load(self, key: str) -> Dict[str, Any] | None:
+        try:
+            with open(self._path(key)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+    
+    def _save(self, key: str, response: Dict[str, Any], elapsed: float) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so a concurrent replay never reads a partial file
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"request": key, "elapsed": elapsed, "response": response}, f, separators=(",", ":"))
+        os.replace(temp_path, path)
+    
+    async def load(self, key: str) -> Dict[str, Any] | None:
+        try:
+            return await asyncio.to_thread(self._load, key)
+        except (OSError, ValueError) as e:
+            print(f"Cassette read failed: {e}", file=sys.stderr)
+            return None
+    
+    async def save(self, key: str, response: Dict[str, Any], elapsed: float) -> None:
+        try:
+            await asyncio.to_thread(self._save, key, response, elapsed)
+        except OSError as e:
+            print(f"Cassette write failed: {e}", file=sys.stderr)
+
+# Record/replay of upstream traffic: "record" saves every final response,
+# "replay" serves only from cassettes and never touches the network. Both
+# bypass the disk cache and the cache daemon, so every request reaches the
+# cassettes. GOOGLE_MAPS_CASSETTE_REPLAY_LATENCY replays with the recorded
+# upstream latency.
+CASSETTE_MODE = os.getenv("GOOGLE_MAPS_CASSETTE_MODE", "off")
+CASSETTE_DIR = os.getenv("GOOGLE_MAPS_CASSETTE_DIR", "cassettes")
+CASSETTE_REPLAY_LATENCY = os.getenv("GOOGLE_MAPS_CASSETTE_REPLAY_LATENCY", "false").lower() in ("1", "true", "yes")
+if CASSETTE_MODE not in ("off", "record", "replay"):
+    raise ValueError("GOOGLE_MAPS_CASSETTE_MODE must be off, record or replay")
+
+_cassettes = CassetteStore(CASSETTE_DIR)
+
+# Upstream calls currently in flight, keyed by request_key(), and how many
+# callers are waiting for each
+_inflight: Dict[str, asyncio.Task] = {}
+_inflight_waiters: Dict[asyncio.Task, int] = {}
+
+async def make_google_request(
+    endpoint: str,
+    params: Dict[str, Any],
+    elements: int | None = None
+) -> Dict[str, Any] | None:
+    """Make a request to Google Maps API with proper error handling.
+    
+    Concurrent calls with the same endpoint and normalized params share a
+    single upstream request. That request goes to the cache daemon when one is
+    configured, and otherwise is answered from the disk cache or upstream.
+    The shared request is cancelled once every caller waiting for it has
+    been cancelled. The returned dict may be shared between callers and must
+    not be mutated.
+    """
+    key = request_key(endpoint, params)
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_dispatch_request(key, endpoint, dict(params), elements))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: (_inflight.pop(key, None), _inflight_waiters.pop(task, None)))
+    else:
+        metrics.inc("google_maps_coalesced_requests_total", {"endpoint": endpoint})
+    _inflight_waiters[task] = _inflight_waiters.get(task, 0) + 1
+    try:
+        # Shield so one cancelled caller does not cancel the request for the others
+        return await asyncio.shield(task)
+    except asyncio.CancelledError:
+        if _inflight_waiters.get(task) == 1 and not task.done():
+            task.cancel()
+        raise
+    finally:
+        if task in _inflight_waiters:
+            _inflight_waiters[task] -= 1
+
+async def _dispatch_request(
+    key: str,
+    endpoint: str,
+    params: Dict[str, Any],
+    elements: int | None = None
+) -> Dict[str, Any] | None:
+    """Forward a request to the cache daemon, or handle it in this process if there is none.
+    
+    Cassette record and replay always run in this process. Only a daemon
+    that cannot be reached is bypassed; once the daemon has the request, a
+    timeout, error or dropped connection fails the request rather than
+    sending it upstream a second time.
+    """
+    if _daemon_client is not None and CASSETTE_MODE == "off":
+        try:
+            return await _daemon_client.request(endpoint, params, elements)
+        except (OSError, ValueError) as e:
+            print(f"Cache daemon unavailable, handling request locally: {e}", file=sys.stderr)
+    return await _cached_fetch(key, endpoint, params, elements)
+
+async def _cached_fetch(
+    key: str,
+    endpoint: str,
+    params: Dict[str, Any],
+    elements: int | None = None
+) -> Dict[str, Any] | None:
+    """Serve a request from the disk cache, falling back to upstream and storing the result."""
+    ttl = DISK_CACHE_TTLS.get(endpoint)
+    if _disk_cache is None or not ttl or CASSETTE_MODE != "off":
+        return await _fetch_google(endpoint, params, elements)
+    
+    data = await _disk_cache.get(key)
+    record_cache("disk", data is not None)
+    if data is not None:
+        return data
+    
+    data = await _fetch_google(endpoint, params, elements)
+    if data is not None:
+        await _disk_cache.set(key, endpoint, data, ttl)
+    return data
+
+async def _fetch_google(
+    endpoint: str,
+    params: Dict[str, Any],
+    elements: int | None = None
+) -> Dict[str, Any] | None:
+    """Send one logical request upstream, retrying transient failures.
+    
+    Transient failures (OVER_QUERY_LIMIT, UNKNOWN_ERROR, HTTP 429/5xx and
+    network errors) are retried with jittered exponential backoff until
+    RETRY_MAX_ATTEMPTS or RETRY_MAX_ELAPSED seconds is reached. Every
+    attempt first waits for the endpoint's client-side rate limit; that wait
+    does not count against RETRY_MAX_ELAPSED. Inside a tool call, all
+    requests also share RETRY_MAX_ELAPSED seconds of backoff, so a call that
+    sends many requests cannot multiply the retry time. `elements`
+    overrides the billable element count derived from `params`. In cassette
+    record mode final responses are saved; in replay mode they are served
+    from disk instead.
+    """
+    if CASSETTE_MODE == "replay":
+        return await _replay_google(endpoint, params)
+    if elements is None:
+        elements = count_elements(endpoint, params)
     params["key"] = GOOGLE_MAPS_API_KEY
     
     url = f"{GOOGLE_MAPS_BASE_URL}/{endpoint}"
+    client = get_http_client()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + RETRY_MAX_ELAPSED
+    budget = _retry_budget.get()
+    attempt = 0
     
-    async with httpx.AsyncClient() as client:
+    while True:
+        retry_after = None
+        waited = await acquire_rate_limit(endpoint, elements)
+        # Queueing on the rate limiter does not count against the retry budget
+        deadline += waited
+        metrics.observe("google_maps_rate_limit_wait_seconds", waited, {"endpoint": endpoint, "tool": _current_tool.get()})
+        started = time.monotonic()
+        outcome = "transport_error"
         try:
-            response = await client.get(url, params=params, timeout=30.0)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get("status") != "OK":
-                print(f"Google Maps API error: {data.get('error_message', data.get('status'))}")
-                return None
+            response = await client.get(url, params=params)
+            outcome = f"HTTP {response.status_code}"
+            if response.status_code in RETRYABLE_HTTP_STATUSES:
+                error = outcome
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            else:
+                response.raise_for_status()
+                data = response.json()
+                status = data.get("status")
+                outcome = str(status)
+                
+                if CASSETTE_MODE == "record" and status not in RETRYABLE_GOOGLE_STATUSES:
+                    await _cassettes.save(request_key(endpoint, params), data, time.monotonic() - started)
                 
-            return data
+                if status == "OK":
+                    return data
+                
+                error = data.get("error_message", status)
+                if status not in RETRYABLE_GOOGLE_STATUSES:
+                    print(f"Google Maps API error: {error}", file=sys.stderr)
+                    return None
+        except httpx.TransportError as e:
+            error = str(e) or type(e).__name__
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
         except Exception as e:
-            print(f"Request failed: {e}")
+            print(f"Request failed: {e}", file=sys.stderr)
+            return None
+        finally:
+            labels = {"endpoint": endpoint}
+            metrics.observe("google_maps_upstream_latency_seconds", time.monotonic() - started, labels)
+            metrics.inc("google_maps_upstream_requests_total", {**labels, "tool": _current_tool.get(), "status": outcome})
+        
+        delay = backoff_delay(attempt, retry_after)
+        attempt += 1
+        if (
+            attempt >= RETRY_MAX_ATTEMPTS
+            or loop.time() + delay > deadline
+            or (budget is not None and not budget.spend(delay))
+        ):
+            print(f"Request failed after {attempt} attempts: {error}", file=sys.stderr)
             return None
+        metrics.inc("google_maps_upstream_retries_total", {"endpoint": endpoint})
+        await asyncio.sleep(delay)
 
-@mcp.tool()
-async def geocode_address(address: str) -> str:
-    """Convert an address into geographic coordinates.
+async def _replay_google(endpoint: str, params: Dict[str, Any]) -> Dict[str, Any] | None:
+    """Answer a request from its recorded cassette without touching the network."""
+    key = request_key(endpoint, params)
+    entry = await _cassettes.load(key)
+    if entry is None:
+        print(f"No cassette recorded for {key}", file=sys.stderr)
+        return None
+    if CASSETTE_REPLAY_LATENCY:
+        await asyncio.sleep(entry["elapsed"])
+    
+    data = entry["response"]
+    if data.get("status") != "OK":
+        print(f"Google Maps API error: {data.get('error_message', data.get('status'))}", file=sys.stderr)
+        return None
+    return data
+
+class TTLCache:
+    """In-memory LRU cache bounded by entry count and approximate size, with per-entry TTL."""
+    
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: OrderedDict[Any, tuple[float, int, Any]] = OrderedDict()
+        self._bytes = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, key: Any) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, _, value = entry
+        if expires < time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+    
+    def pop(self, key: Any) -> Any | None:
+        value = self.get(key)
+        if value is not None:
+            self._remove(key)
+        return value
+    
+    def set(self, key: Any, value: Any, ttl: float | None = None) -> None:
+        size = len(json.dumps(value, separators=(",", ":"), default=str))
+        if key in self._entries:
+            self._remove(key)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), size, value)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+    
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+    
+    def _remove(self, key: Any) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+def normalize_address(address: str) -> str:
+    """Normalize an address for cache lookups: case, whitespace and comma spacing."""
+    address = re.sub(r"\s*,\s*", ", ", address.casefold())
+    return re.sub(r"\s+", " ", address).strip(" ,.")
+
+# Geocode results keyed by (normalized address, language, region)
+_geocode_cache = TTLCache(
+    max_entries=int(os.getenv("GOOGLE_MAPS_GEOCODE_CACHE_SIZE", "10000")),
+    max_bytes=int(os.getenv("GOOGLE_MAPS_GEOCODE_CACHE_BYTES", str(32 * 1024 * 1024))),
+    ttl=float(os.getenv("GOOGLE_MAPS_GEOCODE_CACHE_TTL", "86400")),
+)
+
+async def geocode(
+    address: str,
+    language: Optional[str] = None,
+    region: Optional[str] = None
+) -> Dict[str, Any] | None:
+    """Return the top geocoding result for an address, served from cache when possible."""
+    cache_key = (normalize_address(address), language, region)
+    result = _geocode_cache.get(cache_key)
+    record_cache("geocode", result is not None)
+    if result is not None:
+        return result
     
-    Args:
-        address: The address to geocode (e.g., "1600 Amphitheatre Parkway, Mountain View, CA")
-    """
     params = {"address": address}
+    if language:
+        params["language"] = language
+    if region:
+        params["region"] = region
+    data = await make_google_request("geocode/json", params)
+    
+    if not data or not data.get("results"):
+        return None
+    
+    result = data["results"][0]
+    _geocode_cache.set(cache_key, result)
+    return result
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance in metres between two points."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lng2 - lng1) / 2) ** 2
+    )
+    return 2 * 6371008.8 * math.asin(math.sqrt(a))
+
+class SpatialGrid:
+    """Quantizes points into cells roughly `cell_size` metres on a side.
+    
+    Longitude steps widen with latitude, so every point within `cell_size`
+    metres of a query point lies in the 3x3 block of cells around it.
+    """
+    
+    def __init__(self, cell_size: float):
+        self.cell_size = cell_size
+        self._lat_step = cell_size / 111320.0
+    
+    def _lng_step(self, row: int) -> float:
+        return self._lat_step / max(math.cos(math.radians((row + 0.5) * self._lat_step)), 0.01)
+    
+    def cell(self, lat: float, lng: float) -> tuple[int, int]:
+        row = math.floor(lat / self._lat_step)
+        return row, math.floor(lng / self._lng_step(row))
+    
+    def nearby_cells(self, lat: float, lng: float) -> Iterable[tuple[int, int]]:
+        row = math.floor(lat / self._lat_step)
+        for r in (row - 1, row, row + 1):
+            col = math.floor(lng / self._lng_step(r))
+            for c in (col - 1, col, col + 1):
+                yield r, c
+
+class GridCache(SpatialGrid):
+    """Spatial cache that answers lookups from a stored point within `cell_size` metres.
+    
+    Each cell holds the last point stored in it, so a lookup only has to
+    inspect the 3x3 block of cells around the query point.
+    """
+    
+    def __init__(self, cell_size: float, max_entries: int, max_bytes: int, ttl: float):
+        super().__init__(cell_size)
+        self._cells = TTLCache(max_entries, max_bytes, ttl)
+    
+    def get(self, lat: float, lng: float) -> Any | None:
+        best = None
+        for cell in self.nearby_cells(lat, lng):
+            entry = self._cells.get(cell)
+            if entry is None:
+                continue
+            distance = haversine_m(lat, lng, entry[0], entry[1])
+            if distance <= self.cell_size and (best is None or distance < best[0]):
+                best = (distance, entry[2])
+        return best[1] if best else None
+    
+    def set(self, lat: float, lng: float, value: Any) -> None:
+        self._cells.set(self.cell(lat, lng), (lat, lng, value))
+    
+    def clear(self) -> None:
+        self._cells.clear()
+
+# Reverse geocode results reused for any point within this many metres (0 disables)
+REVERSE_GEOCODE_TOLERANCE = float(os.getenv("GOOGLE_MAPS_REVERSE_GEOCODE_TOLERANCE", "10"))
+_reverse_geocode_cache = GridCache(
+    cell_size=REVERSE_GEOCODE_TOLERANCE or 1.0,
+    max_entries=int(os.getenv("GOOGLE_MAPS_REVERSE_GEOCODE_CACHE_SIZE", "50000")),
+    max_bytes=int(os.getenv("GOOGLE_MAPS_REVERSE_GEOCODE_CACHE_BYTES", str(64 * 1024 * 1024))),
+    ttl=float(os.getenv("GOOGLE_MAPS_REVERSE_GEOCODE_CACHE_TTL", "86400")),
+)
+
+async def reverse_geocode_point(latitude: float, longitude: float) -> Dict[str, Any] | None:
+    """Return the top reverse geocoding result, reusing a nearby cached point when possible."""
+    if REVERSE_GEOCODE_TOLERANCE > 0:
+        result = _reverse_geocode_cache.get(latitude, longitude)
+        record_cache("reverse_geocode", result is not None)
+        if result is not None:
+            return result
+    
+    params = {"latlng": f"{latitude},{longitude}"}
     data = await make_google_request("geocode/json", params)
     
     if not data or not data.get("results"):
-        return "Unable to geocode the provided address."
+        return None
     
     result = data["results"][0]
+    if REVERSE_GEOCODE_TOLERANCE > 0:
+        _reverse_geocode_cache.set(latitude, longitude, result)
+    return result
+
+ProgressCallback = Callable[[int, int], Awaitable[None]]
+
+def progress_reporter(ctx: Context | None) -> ProgressCallback | None:
+    """Progress callback that sends MCP progress notifications for the current request."""
+    if ctx is None:
+        return None
+    
+    async def report(done: int, total: int) -> None:
+        try:
+            await ctx.report_progress(done, total)
+        except Exception as e:
+            print(f"Progress notification failed: {e}", file=sys.stderr)
+    
+    return report
+
+async def _wait_for_completions(
+    total: int,
+    completions: asyncio.Queue,
+    progress: ProgressCallback | None = None,
+    timeout: float | None = None
+) -> int:
+    """Count items put on `completions` until `total` arrive or `timeout` expires.
+    
+    Progress is reported once per wakeup, covering every completion queued
+    since the last report.
+    """
+    completed = 0
+    deadline = asyncio.get_running_loop().time() + timeout if timeout is not None else None
+    try:
+        async with asyncio.timeout_at(deadline):
+            while completed < total:
+                await completions.get()
+                completed += 1
+                while not completions.empty():
+                    completions.get_nowait()
+                    completed += 1
+                if progress:
+                    await progress(completed, total)
+    except TimeoutError:
+        pass
+
+async def gather_with_progress(
+    aws: List[Awaitable[Any]],
+    progress: ProgressCallback | None = None,
+    timeout: float | None = None
+) -> tuple[List[Any], List[bool]]:
+    """Await all awaitables, reporting progress as each one completes.
+    
+    Returns the results in order and, for each, whether it finished before
+    `timeout` expired. Entries that raised or did not finish are None. Work
+    still pending at the timeout, or when the caller is cancelled, is
+    cancelled, which also drops upstream requests nobody else waits for.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    completions: asyncio.Queue = asyncio.Queue()
+    for task in tasks:
+        task.add_done_callback(completions.put_nowait)
+    try:
+        await _wait_for_completions(len(tasks), completions, progress, timeout)
+    finally:
+        for task in tasks:
+            task.cancel()
+    
+    finished = [task.done() and not task.cancelled() for task in tasks]
+    results = [
+        task.result() if done and task.exception() is None else None
+        for task, done in zip(tasks, finished)
+    ]
+    return results, finished
+
+# Upper bound on concurrent lookups issued by the batch tools
+BATCH_CONCURRENCY = int(os.getenv("GOOGLE_MAPS_BATCH_CONCURRENCY", "10"))
+
+async def map_bounded(
+    func: Callable[[Any], Awaitable[Any]],
+    items: List[Any],
+    concurrency: int | None = None,
+    progress: ProgressCallback | None = None,
+    timeout: float | None = None
+) -> tuple[List[Any], List[bool]]:
+    """Apply an async function to items with at most `concurrency` calls in flight.
+    
+    A fixed pool of workers pulls items in order. Progress, partial results
+    and cancellation behave as in gather_with_progress().
+    """
+    results: List[Any] = [None] * len(items)
+    finished = [False] * len(items)
+    pending = iter(enumerate(items))
+    completions: asyncio.Queue = asyncio.Queue()
+    
+    async def worker() -> None:
+        for index, item in pending:
+            try:
+                results[index] = await func(item)
+            except Exception:
+                pass
+            finished[index] = True
+            completions.put_nowait(index)
+    
+    workers = [
+        asyncio.ensure_future(worker())
+        for _ in range(min(len(items), max(1, concurrency or BATCH_CONCURRENCY)))
+    ]
+    try:
+        await _wait_for_completions(len(items), completions, progress, timeout)
+    finally:
+        for task in workers:
+            task.cancel()
+    return results, finished
+
+# Per-request limits of the Google web services. URLs may be up to 16384
+# characters; the default leaves room for the base URL and other params.
+MAX_URL_PARAM_LENGTH = int(os.getenv("GOOGLE_MAPS_MAX_URL_PARAM_LENGTH", "8000"))
+DISTANCE_MATRIX_MAX_ORIGINS = 25
+DISTANCE_MATRIX_MAX_DESTINATIONS = 25
+DISTANCE_MATRIX_MAX_ELEMENTS = 100
+ELEVATION_MAX_LOCATIONS = 512
+
+def _encode_polyline_value(value: int) -> str:
+    value = ~(value << 1) if value < 0 else value << 1
+    chunks = []
+    while value >= 0x20:
+        chunks.append(chr((0x20 | (value & 0x1f)) + 63))
+        value >>= 5
+    chunks.append(chr(value + 63))
+    return "".join(chunks)
+
+def encode_polyline(points: List[tuple[float, float]]) -> str:
+    """Encode (lat, lng) points with Google's Encoded Polyline Algorithm (5 decimals)."""
+    encoded = []
+    prev_lat = prev_lng = 0
+    for lat, lng in points:
+        ilat, ilng = round(lat * 1e5), round(lng * 1e5)
+        encoded.append(_encode_polyline_value(ilat - prev_lat) + _encode_polyline_value(ilng - prev_lng))
+        prev_lat, prev_lng = ilat, ilng
+    return "".join(encoded)
+
+def decode_polyline(encoded: str) -> List[tuple[float, float]]:
+    """Decode an Encoded Polyline Algorithm string back into (lat, lng) points."""
+    points = []
+    index = lat = lng = 0
+    while index < len(encoded):
+        deltas = []
+        for _ in range(2):
+            shift = result = 0
+            while True:
+                byte = ord(encoded[index]) - 63
+                index += 1
+                result |= (byte & 0x1f) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            deltas.append(~(result >> 1) if result & 1 else result >> 1)
+        lat += deltas[0]
+        lng += deltas[1]
+        points.append((lat / 1e5, lng / 1e5))
+    return points
+
+def chunk_locations(points: List[tuple[float, float]]) -> List[tuple[int, str]]:
+    """Split points into (count, `locations` value) pairs within the per-request limits.
+    
+    Each chunk uses the "enc:" polyline form when it is shorter than the
+    "|"-joined coordinates (and lossless at the cache precision).
+    """
+    allow_polyline = ELEVATION_CACHE_PRECISION <= 5
+    chunks: List[List[tuple[float, float]]] = []
+    current: List[tuple[float, float]] = []
+    plain_length = polyline_length = 0
+    prev = (0, 0)
+    for lat, lng in points:
+        ilat, ilng = round(lat * 1e5), round(lng * 1e5)
+        if current:
+            plain = len(quote(f"{lat},{lng}", safe=",")) + 3
+            polyline = len(quote(_encode_polyline_value(ilat - prev[0]) + _encode_polyline_value(ilng - prev[1])))
+            fits = plain_length + plain <= MAX_URL_PARAM_LENGTH or (
+                allow_polyline and polyline_length + polyline <= MAX_URL_PARAM_LENGTH
+            )
+            if len(current) >= ELEVATION_MAX_LOCATIONS or not fits:
+                chunks.append(current)
+                current = []
+        if not current:
+            plain_length = len(quote(f"{lat},{lng}", safe=","))
+            polyline_length = len("enc:") + len(quote(_encode_polyline_value(ilat) + _encode_polyline_value(ilng)))
+        else:
+            plain_length += plain
+            polyline_length += polyline
+        current.append((lat, lng))
+        prev = (ilat, ilng)
+    if current:
+        chunks.append(current)
+    
+    values = []
+    for chunk in chunks:
+        plain_value = "|".join(f"{lat},{lng}" for lat, lng in chunk)
+        polyline_value = "enc:" + encode_polyline(chunk)
+        if allow_polyline and len(quote(polyline_value, safe=":")) < len(quote(plain_value, safe=",")):
+            values.append((len(chunk), polyline_value))
+        else:
+            values.append((len(chunk), plain_value))
+    return values
+
+# Elevation is effectively static, so results are cached per rounded coordinate
+ELEVATION_CACHE_PRECISION = int(os.getenv("GOOGLE_MAPS_ELEVATION_CACHE_PRECISION", "5"))
+_elevation_cache = TTLCache(
+    max_entries=int(os.getenv("GOOGLE_MAPS_ELEVATION_CACHE_SIZE", "200000")),
+    max_bytes=int(os.getenv("GOOGLE_MAPS_ELEVATION_CACHE_BYTES", str(64 * 1024 * 1024))),
+    ttl=float(os.getenv("GOOGLE_MAPS_ELEVATION_CACHE_TTL", str(365 * 86400))),
+)
+
+async def lookup_elevations(
+    locations: List[Dict[str, float]],
+    progress: ProgressCallback | None = None,
+    timeout: float | None = None
+) -> tuple[List[Dict[str, Any] | None], List[bool]]:
+    """Return elevation results in input order, fetching only uncached points upstream.
+    
+    Misses are split into URL-limit-respecting chunks (polyline-encoded when
+    shorter) and fetched concurrently. Points whose chunk failed or did not
+    finish within `timeout` are None; the second list says, per point,
+    whether its lookup finished.
+    """
+    keys = [
+        (round(loc["lat"], ELEVATION_CACHE_PRECISION), round(loc["lng"], ELEVATION_CACHE_PRECISION))
+        for loc in locations
+    ]
+    found = {}
+    for key in keys:
+        if key not in found:
+            found[key] = _elevation_cache.get(key)
+            record_cache("elevation", found[key] is not None)
+    misses = [key for key, result in found.items() if result is None]
+    pending = set()
+    
+    if misses:
+        async def fetch_chunk(count: int, value: str) -> List[Dict[str, Any]] | None:
+            data = await make_google_request("elevation/json", {"locations": value}, elements=count)
+            if not data or len(data.get("results", [])) != count:
+                return None
+            return data["results"]
+        
+        chunks = chunk_locations(misses)
+        fetched, finished = await gather_with_progress(
+            [fetch_chunk(count, value) for count, value in chunks], progress, timeout
+        )
+        
+        start = 0
+        for (count, _), results, done in zip(chunks, fetched, finished):
+            if not done:
+                pending.update(misses[start:start + count])
+            for key, result in zip(misses[start:start + count], results or []):
+                found[key] = result
+                _elevation_cache.set(key, result)
+            start += count
+    
+    return [found[key] for key in keys], [key not in pending for key in keys]
+
+def chunk_pipe_list(items: List[str], max_items: int, max_length: int) -> List[List[str]]:
+    """Split items into chunks whose URL-encoded "|"-joined form fits max_items and max_length."""
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    length = 0
+    for item in items:
+        item_length = len(quote(item, safe=",")) + (3 if current else 0)
+        if current and (len(current) >= max_items or length + item_length > max_length):
+            chunks.append(current)
+            current, length = [], 0
+            item_length -= 3
+        current.append(item)
+        length += item_length
+    if current:
+        chunks.append(current)
+    return chunks
+
+# Distance matrix elements cached per (origin, destination, mode, time bucket)
+DISTANCE_MATRIX_CACHE_BUCKET = float(os.getenv("GOOGLE_MAPS_DISTANCE_MATRIX_CACHE_BUCKET", "900"))
+_distance_matrix_cache = TTLCache(
+    max_entries=int(os.getenv("GOOGLE_MAPS_DISTANCE_MATRIX_CACHE_SIZE", "200000")),
+    max_bytes=int(os.getenv("GOOGLE_MAPS_DISTANCE_MATRIX_CACHE_BYTES", str(64 * 1024 * 1024))),
+    ttl=DISTANCE_MATRIX_CACHE_BUCKET,
+)
+
+async def lookup_distance_matrix(
+    origins: List[str],
+    destinations: List[str],
+    mode: str,
+    progress: ProgressCallback | None = None,
+    timeout: float | None = None
+) -> Dict[str, Any] | None:
+    """Build a Distance Matrix response, requesting only the sub-matrix of uncached cells.
+    
+    Large matrices are split into tiles of at most 25 origins, 25 destinations
+    and 100 elements that are fetched concurrently under the rate limiter.
+    Cells of tiles that failed after their retries get status UNKNOWN_ERROR
+    and are counted in "failed_cells"; cells of tiles that did not finish
+    within `timeout` get status PENDING and set "partial". Returns None
+    only when no cell is cached or fetched. The result has the same shape as
+    the API response (origin_addresses, destination_addresses,
+    rows[].elements[]) in input order.
+    """
+    if not origins or not destinations:
+        return None
+    
+    bucket = int(time.time() // DISTANCE_MATRIX_CACHE_BUCKET)
+    origin_keys = [normalize_address(origin) for origin in origins]
+    destination_keys = [normalize_address(destination) for destination in destinations]
+    unique_origins = dict(zip(origin_keys, origins))
+    unique_destinations = dict(zip(destination_keys, destinations))
+    
+    cells = {
+        (o, d): _distance_matrix_cache.get((o, d, mode, bucket))
+        for o in unique_origins
+        for d in unique_destinations
+    }
+    for cell in cells.values():
+        record_cache("distance_matrix", cell is not None)
+    missing_origins = [o for o in unique_origins if any(cells[o, d] is None for d in unique_destinations)]
+    missing_destinations = [d for d in unique_destinations if any(cells[o, d] is None for o in missing_origins)]
+    
+    # Tile the missing sub-matrix into requests within Google's per-request
+    # limits, skip tiles that are already fully cached and fetch the rest concurrently
+    destination_chunks = chunk_pipe_list(
+        missing_destinations, DISTANCE_MATRIX_MAX_DESTINATIONS, MAX_URL_PARAM_LENGTH // 2
+    )
+    tiles = []
+    for destination_chunk in destination_chunks:
+        max_origins = min(DISTANCE_MATRIX_MAX_ORIGINS, DISTANCE_MATRIX_MAX_ELEMENTS // len(destination_chunk))
+        for origin_chunk in chunk_pipe_list(missing_origins, max_origins, MAX_URL_PARAM_LENGTH // 2):
+            if any(cells[o, d] is None for o in origin_chunk for d in destination_chunk):
+                tiles.append((origin_chunk, destination_chunk))
+    
+    async def fetch_tile(origin_chunk: List[str], destination_chunk: List[str]) -> bool:
+        params = {
+            "origins": "|".join(unique_origins[o] for o in origin_chunk),
+            "destinations": "|".join(unique_destinations[d] for d in destination_chunk),
+            "mode": mode
+        }
+        data = await make_google_request("distancematrix/json", params)
+        
+        if not data or len(data.get("rows", [])) != len(origin_chunk):
+            return False
+        
+        for i, o in enumerate(origin_chunk):
+            for j, d in enumerate(destination_chunk):
+                cell = {
+                    "origin_address": data["origin_addresses"][i],
+                    "destination_address": data["destination_addresses"][j],
+                    "element": data["rows"][i]["elements"][j],
+                }
+                cells[o, d] = cell
+                _distance_matrix_cache.set((o, d, mode, bucket), cell)
+        return True
+    
+    complete = True
+    failed_cells = 0
+    if tiles:
+        any_cached = any(cell is not None for cell in cells.values())
+        fetched, finished = await gather_with_progress([fetch_tile(*tile) for tile in tiles], progress, timeout)
+        complete = all(finished)
+        if not any(fetched) and not any_cached:
+            return None
+        
+        for (origin_chunk, destination_chunk), ok, done in zip(tiles, fetched, finished):
+            if ok:
+                continue
+            for o in origin_chunk:
+                for d in destination_chunk:
+                    if cells[o, d] is None:
+                        if done:
+                            failed_cells += 1
+                        cells[o, d] = {
+                            "origin_address": unique_origins[o],
+                            "destination_address": unique_destinations[d],
+                            "element": {"status": "UNKNOWN_ERROR" if done else "PENDING"},
+                        }
+    
+    return {
+        "partial": not complete,
+        "failed_cells": failed_cells,
+        "origin_addresses": [cells[o, destination_keys[0]]["origin_address"] for o in origin_keys],
+        "destination_addresses": [cells[origin_keys[0], d]["destination_address"] for d in destination_keys],
+        "rows": [{"elements": [cells[o, d]["element"] for d in destination_keys]} for o in origin_keys],
+    }
+
+# Place details cached in memory in front of place/details/json
+PLACE_DETAILS_FIELDS = "name,formatted_address,formatted_phone_number,website,rating,reviews,opening_hours,geometry"
+_place_details_cache = TTLCache(
+    max_entries=int(os.getenv("GOOGLE_MAPS_PLACE_DETAILS_CACHE_SIZE", "5000")),
+    max_bytes=int(os.getenv("GOOGLE_MAPS_PLACE_DETAILS_CACHE_BYTES", str(64 * 1024 * 1024))),
+    ttl=float(os.getenv("GOOGLE_MAPS_PLACE_DETAILS_CACHE_TTL", "3600")),
+)
+
+# Speculative prefetch of details for the top search_places results, limited
+# to a budget of prefetches per hour. Disabled unless TOP_K is set.
+DETAILS_PREFETCH_TOP_K = int(os.getenv("GOOGLE_MAPS_DETAILS_PREFETCH_TOP_K", "0"))
+DETAILS_PREFETCH_BUDGET = float(os.getenv("GOOGLE_MAPS_DETAILS_PREFETCH_BUDGET", "500"))
+_details_prefetch_budget = TokenBucket(DETAILS_PREFETCH_BUDGET / 3600, DETAILS_PREFETCH_BUDGET)
+# Place IDs prefetched but not yet requested by a client
+_prefetched_places = TTLCache(max_entries=10000, max_bytes=1024 * 1024, ttl=_place_details_cache.ttl)
+_background_tasks: set[asyncio.Task] = set()
+
+def place_details_params(place_id: str) -> Dict[str, Any]:
+    return {
+        "place_id": place_id,
+        "fields": PLACE_DETAILS_FIELDS
+    }
+
+async def _load_place_details(place_id: str) -> Dict[str, Any] | None:
+    place = _place_details_cache.get(place_id)
+    record_cache("place_details", place is not None)
+    if place is not None:
+        return place
+    
+    data = await make_google_request("place/details/json", place_details_params(place_id))
+    
+    if not data or not data.get("result"):
+        return None
+    
+    place = data["result"]
+    _place_details_cache.set(place_id, place)
+    return place
+
+async def place_details(place_id: str) -> Dict[str, Any] | None:
+    """Return the details result for a place, served from cache when possible."""
+    # A prefetch counts as a hit if its result is still cached or its request
+    # is still running, in which case this call joins it
+    if _prefetched_places.pop(place_id) is not None and (
+        _place_details_cache.get(place_id) is not None
+        or request_key("place/details/json", place_details_params(place_id)) in _inflight
+    ):
+        metrics.inc("google_maps_details_prefetch_total", {"result": "hits"})
+    return await _load_place_details(place_id)
+
+def _prefetch_done(place_id: str, task: asyncio.Task) -> None:
+    _background_tasks.discard(task)
+    if task.cancelled() or task.exception() is not None or task.result() is None:
+        _prefetched_places.pop(place_id)
+
+def prefetch_place_details(place_ids: List[str]) -> None:
+    """Warm the details cache for up to DETAILS_PREFETCH_TOP_K places in the background."""
+    for place_id in place_ids[:DETAILS_PREFETCH_TOP_K]:
+        if _place_details_cache.get(place_id) is not None or _prefetched_places.get(place_id) is not None:
+            continue
+        if not _details_prefetch_budget.try_acquire():
+            metrics.inc("google_maps_details_prefetch_total", {"result": "skipped_budget"})
+            continue
+        metrics.inc("google_maps_details_prefetch_total", {"result": "prefetched"})
+        _prefetched_places.set(place_id, True)
+        task = asyncio.ensure_future(_load_place_details(place_id))
+        _background_tasks.add(task)
+        task.add_done_callback(functools.partial(_prefetch_done, place_id))
+
+# Text Search returns up to 20 results per page and 3 pages in total. A
+# next_page_token only becomes valid a short while after it is issued.
+SEARCH_MAX_RESULTS = 60
+SEARCH_PAGE_TOKEN_DELAY = float(os.getenv("GOOGLE_MAPS_SEARCH_PAGE_TOKEN_DELAY", "2"))
+SEARCH_PAGE_TOKEN_ATTEMPTS = 4
+SEARCH_PREFETCH_ENABLED = os.getenv("GOOGLE_MAPS_SEARCH_PREFETCH", "true").lower() in ("1", "true", "yes")
+_search_page_cache = TTLCache(
+    max_entries=int(os.getenv("GOOGLE_MAPS_SEARCH_CACHE_SIZE", "1000")),
+    max_bytes=int(os.getenv("GOOGLE_MAPS_SEARCH_CACHE_BYTES", str(32 * 1024 * 1024))),
+    ttl=float(os.getenv("GOOGLE_MAPS_SEARCH_CACHE_TTL", "300")),
+)
+# Loop time at which each issued next_page_token becomes usable
+_page_token_ready = TTLCache(max_entries=10000, max_bytes=1024 * 1024, ttl=300)
+_page_prefetches: Dict[tuple[str, str | None], asyncio.Task] = {}
+
+def encode_cursor(page_token: str | None, offset: int) -> str:
+    """Opaque search_places cursor: a Google page token plus an offset into that page."""
+    return base64.urlsafe_b64encode(json.dumps([page_token, offset]).encode()).decode()
+
+def decode_cursor(cursor: str) -> tuple[str | None, int]:
+    try:
+        page_token, offset = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(offset, int) or offset < 0 or not isinstance(page_token, (str, type(None))):
+        raise ValueError("Invalid cursor")
+    return page_token, offset
+
+async def _fetch_search_page(params: Dict[str, str], page_token: str | None) -> Dict[str, Any] | None:
+    if page_token is None:
+        data = await make_google_request("place/textsearch/json", params)
+    else:
+        # Google answers INVALID_REQUEST until the token is active, so wait
+        # for the activation delay and retry a few times after it
+        ready = _page_token_ready.get(page_token)
+        loop = asyncio.get_running_loop()
+        if ready is not None and ready > loop.time():
+            await asyncio.sleep(ready - loop.time())
+        data = None
+        budget = _retry_budget.get()
+        for attempt in range(SEARCH_PAGE_TOKEN_ATTEMPTS):
+            if attempt:
+                # Polling an inactive token is a retry and shares the call's budget
+                if budget is not None and not budget.spend(SEARCH_PAGE_TOKEN_DELAY / 2):
+                    break
+                await asyncio.sleep(SEARCH_PAGE_TOKEN_DELAY / 2)
+            data = await make_google_request("place/textsearch/json", {"pagetoken": page_token})
+            if data is not None:
+                break
+    
+    if data and data.get("next_page_token"):
+        _page_token_ready.set(data["next_page_token"], asyncio.get_running_loop().time() + SEARCH_PAGE_TOKEN_DELAY)
+    return data
+
+async def search_page(params: Dict[str, str], page_token: str | None = None) -> Dict[str, Any] | None:
+    """Return one page of Text Search results, from cache or a pending prefetch when possible."""
+    key = (request_key("place/textsearch/json", params), page_token)
+    data = _search_page_cache.get(key)
+    record_cache("search_page", data is not None)
+    if data is not None:
+        return data
+    
+    task = _page_prefetches.get(key)
+    if task is not None:
+        data = await asyncio.shield(task)
+    else:
+        data = await _fetch_search_page(params, page_token)
+    
+    if data:
+        _search_page_cache.set(key, data)
+    return data
+
+def prefetch_search_page(params: Dict[str, str], page_token: str) -> None:
+    """Start fetching the page for `page_token` in the background."""
+    key = (request_key("place/textsearch/json", params), page_token)
+    if key in _page_prefetches or _search_page_cache.get(key) is not None:
+        return
+    
+    async def prefetch() -> Dict[str, Any] | None:
+        data = await _fetch_search_page(params, page_token)
+        if data:
+            _search_page_cache.set(key, data)
+        return data
+    
+    task = asyncio.ensure_future(prefetch())
+    _page_prefetches[key] = task
+    task.add_done_callback(lambda _: _page_prefetches.pop(key, None))
+
+# Tools return a compact JSON object when output_format is "json", a CSV/TSV
+# table for tools with tabular results, and a human-readable text view otherwise
+OUTPUT_FORMAT = os.getenv("GOOGLE_MAPS_OUTPUT_FORMAT", "text")
+TABLE_DELIMITERS = {"csv": ",", "tsv": "\t"}
+# Tool parameter types, so MCP clients see and validate the accepted values
+OutputFormat = Literal["text", "json"]
+TableOutputFormat = Literal["text", "json", "csv", "tsv"]
+if OUTPUT_FORMAT not in ("text", "json", *TABLE_DELIMITERS):
+    raise ValueError("GOOGLE_MAPS_OUTPUT_FORMAT must be text, json, csv or tsv")
+PARTIAL_RESULTS_NOTE = "Partial results: the time limit was reached before all lookups completed."
+# Batch entries whose lookup was still running at the time limit carry "status": "pending"
+PENDING_NOTE = "Not completed before the time limit."
+
+def render(
+    payload: Dict[str, Any],
+    text_view: Callable[[Dict[str, Any]], str],
+    output_format: Optional[str] = None,
+    table_view: Optional[Callable[[Dict[str, Any]], Iterable[List[Any]]]] = None
+) -> str:
+    """Render a tool payload as compact JSON, a CSV/TSV table or through its text view.
+    
+    Views build their output in one pass (list joins or a csv writer) so
+    rendering stays linear in the size of the result. Partial text and
+    table output end with a note saying so.
+    """
+    output_format = output_format or OUTPUT_FORMAT
+    if output_format == "json":
+        return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+    if output_format in TABLE_DELIMITERS and table_view is not None:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=TABLE_DELIMITERS[output_format], lineterminator="\n")
+        writer.writerows(table_view(payload))
+        if payload.get("partial"):
+            writer.writerow([f"# {PARTIAL_RESULTS_NOTE}"])
+        return buffer.getvalue()
+    if payload.get("partial"):
+        return text_view(payload) + f"\n{PARTIAL_RESULTS_NOTE}\n"
+    return text_view(payload)
+
+def render_error(message: str, output_format: Optional[str] = None) -> str:
+    _tool_failed.set(True)
+    return render({"error": message}, lambda payload: payload["error"], output_format)
+
+def geocode_payload(result: Dict[str, Any]) -> Dict[str, Any]:
     location = result["geometry"]["location"]
+    return {
+        "address": result["formatted_address"],
+        "lat": location["lat"],
+        "lng": location["lng"],
+        "place_id": result["place_id"],
+    }
+
+def format_geocode(payload: Dict[str, Any]) -> str:
+    return f"""
+Address: {payload['address']}
+Coordinates: {payload['lat']}, {payload['lng']}
+Place ID: {payload['place_id']}
+"""
+
+@mcp.tool()
+@instrumented
+async def geocode_address(
+    address: str,
+    language: Optional[str] = None,
+    region: Optional[str] = None,
+    output_format: Optional[OutputFormat] = None
+) -> str:
+    """Convert an address into geographic coordinates.
+    
+    Args:
+        address: The address to geocode (e.g., "1600 Amphitheatre Parkway, Mountain View, CA")
+        language: Optional language code for the results (e.g., "en", "de")
+        region: Optional ccTLD region bias (e.g., "us", "uk")
+        output_format: Optional "text" or "json" (compact structured output)
+    """
     
+    result = await geocode(address, language, region)
+    
+    if not result:
+        return render_error("Unable to geocode the provided address.", output_format)
+    
+    return render(geocode_payload(result), format_geocode, output_format)
+
+def format_batch_geocode(payload: Dict[str, Any]) -> str:
+    entries = []
+    for i, entry in enumerate(payload["results"], 1):
+        if entry.get("status") == "pending":
+            entries.append(f"{i}. {entry['query']}\n{PENDING_NOTE}")
+            continue
+        if "error" in entry:
+            entries.append(f"{i}. {entry['query']}\n{entry['error']}")
+            continue
+        entries.append(
+            f"{i}. {entry['query']}\n"
+            f"Address: {entry['address']}\n"
+            f"Coordinates: {entry['lat']}, {entry['lng']}\n"
+            f"Place ID: {entry['place_id']}"
+        )
+    return "\n\n".join(entries)
+
+@mcp.tool()
+@instrumented
+async def batch_geocode(
+    addresses: List[str],
+    language: Optional[str] = None,
+    region: Optional[str] = None,
+    concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+    output_format: Optional[OutputFormat] = None,
+    ctx: Context = None
+) -> str:
+    """Convert many addresses into geographic coordinates in one call.
+    
+    Args:
+        addresses: List of addresses to geocode; results are returned in the same order
+        language: Optional language code for the results (e.g., "en", "de")
+        region: Optional ccTLD region bias (e.g., "us", "uk")
+        concurrency: Optional maximum number of lookups in flight (default 10)
+        timeout: Optional seconds to wait before returning partial results
+        output_format: Optional "text" or "json" (compact structured output)
+    """
+    
+    unique = {}
+    for address in addresses:
+        unique.setdefault(normalize_address(address), address)
+    
+    results, finished = await map_bounded(
+        lambda address: geocode(address, language, region),
+        list(unique.values()),
+        concurrency,
+        progress_reporter(ctx),
+        timeout
+    )
+    resolved = dict(zip(unique, zip(results, finished)))
+    
+    entries = []
+    for address in addresses:
+        result, done = resolved[normalize_address(address)]
+        if not done:
+            entries.append({"query": address, "status": "pending"})
+        elif not result:
+            entries.append({"query": address, "error": "Unable to geocode the provided address."})
+        else:
+            entries.append({"query": address, **geocode_payload(result)})
+    
+    return render({"results": entries, "partial": not all(finished)}, format_batch_geocode, output_format)
+
+def format_reverse_geocode(payload: Dict[str, Any]) -> str:
     return f"""
-Address: {result['formatted_address']}
-Coordinates: {location['lat']}, {location['lng']}
-Place ID: {result['place_id']}
+Formatted Address: {payload['address']}
+Place ID: {payload['place_id']}
+Coordinates: {payload['lat']}, {payload['lng']}
 """
 
 @mcp.tool()
-async def reverse_geocode(latitude: float, longitude: float) -> str:
+@instrumented
+async def reverse_geocode(
+    latitude: float,
+    longitude: float,
+    output_format: Optional[OutputFormat] = None
+) -> str:
     """Convert coordinates into an address.
     
     Args:
         latitude: Latitude coordinate
         longitude: Longitude coordinate
+        output_format: Optional "text" or "json" (compact structured output)
     """
-    params = {"latlng": f"{latitude},{longitude}"}
-    data = await make_google_request("geocode/json", params)
     
-    if not data or not data.get("results"):
-        return "Unable to reverse geocode the provided coordinates."
+    result = await reverse_geocode_point(latitude, longitude)
     
-    result = data["results"][0]
+    if not result:
+        return render_error("Unable to reverse geocode the provided coordinates.", output_format)
     
-    return f"""
-Formatted Address: {result['formatted_address']}
-Place ID: {result['place_id']}
-Coordinates: {latitude}, {longitude}
+    payload = {
+        "address": result["formatted_address"],
+        "place_id": result["place_id"],
+        "lat": latitude,
+        "lng": longitude,
+    }
+    return render(payload, format_reverse_geocode, output_format)
+
+def format_batch_reverse_geocode(payload: Dict[str, Any]) -> str:
+    entries = []
+    for i, entry in enumerate(payload["results"], 1):
+        if entry.get("status") == "pending":
+            entries.append(f"{i}. {entry['lat']}, {entry['lng']}\n{PENDING_NOTE}")
+            continue
+        if "error" in entry:
+            entries.append(f"{i}. {entry['lat']}, {entry['lng']}\n{entry['error']}")
+            continue
+        entries.append(
+            f"{i}. {entry['lat']}, {entry['lng']}\n"
+            f"Formatted Address: {entry['address']}\n"
+            f"Place ID: {entry['place_id']}"
+        )
+    return "\n\n".join(entries)
+
+@mcp.tool()
+@instrumented
+async def batch_reverse_geocode(
+    locations: List[Dict[str, float]],
+    concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+    output_format: Optional[OutputFormat] = None,
+    ctx: Context = None
+) -> str:
+    """Convert many coordinates into addresses in one call.
+    
+    Args:
+        locations: List of coordinate dictionaries with 'lat' and 'lng' keys
+                  Example: [{"lat": 37.7749, "lng": -122.4194}]
+        concurrency: Optional maximum number of lookups in flight (default 10)
+        timeout: Optional seconds to wait before returning partial results
+        output_format: Optional "text" or "json" (compact structured output)
+    """
+    
+    # Cluster points that fall within the reverse geocode tolerance of an
+    # earlier point so each cluster is resolved once. A cell can hold several
+    # representatives, so every earlier one stays available for matching.
+    grid = SpatialGrid(REVERSE_GEOCODE_TOLERANCE or 1.0)
+    cells: Dict[tuple[int, int], List[int]] = {}
+    representatives: List[tuple[float, float]] = []
+    assignment = []
+    for loc in locations:
+        lat, lng = loc["lat"], loc["lng"]
+        index = None
+        if REVERSE_GEOCODE_TOLERANCE > 0:
+            best = REVERSE_GEOCODE_TOLERANCE
+            for cell in grid.nearby_cells(lat, lng):
+                for candidate in cells.get(cell, ()):
+                    distance = haversine_m(lat, lng, *representatives[candidate])
+                    if distance <= best:
+                        index, best = candidate, distance
+        if index is None:
+            index = len(representatives)
+            representatives.append((lat, lng))
+            cells.setdefault(grid.cell(lat, lng), []).append(index)
+        assignment.append(index)
+    
+    results, finished = await map_bounded(
+        lambda point: reverse_geocode_point(*point),
+        representatives,
+        concurrency,
+        progress_reporter(ctx),
+        timeout
+    )
+    
+    entries = []
+    for loc, index in zip(locations, assignment):
+        result = results[index]
+        if not finished[index]:
+            entries.append({"lat": loc["lat"], "lng": loc["lng"], "status": "pending"})
+        elif not result:
+            entries.append({
+                "lat": loc["lat"],
+                "lng": loc["lng"],
+                "error": "Unable to reverse geocode the provided coordinates.",
+            })
+        else:
+            entries.append({
+                "lat": loc["lat"],
+                "lng": loc["lng"],
+                "address": result["formatted_address"],
+                "place_id": result["place_id"],
+            })
+    
+    return render({"results": entries, "partial": not all(finished)}, format_batch_reverse_geocode, output_format)
+
+def format_search_places(payload: Dict[str, Any]) -> str:
+    places = []
+    for place in payload["places"]:
+        place_info = f"""
+Name: {place['name']}
+Address: {place['address'] or 'Address not available'}
+Rating: {place['rating'] or 'No rating'} stars
+Types: {', '.join(place['types'])}
+Place ID: {place['place_id']}
 """
+        places.append(place_info)
+    
+    output = "\n---\n".join(places)
+    if payload["next_cursor"]:
+        output += f"\nNext cursor: {payload['next_cursor']}"
+    return output
 
 @mcp.tool()
+@instrumented
 async def search_places(
     query: str, 
     location: Optional[str] = None, 
-    radius: Optional[int] = None
+    radius: Optional[int] = None,
+    limit: int = 5,
+    cursor: Optional[str] = None,
+    output_format: Optional[OutputFormat] = None
 ) -> str:
     """Search for places using Google Places API.
     
@@ -91,7 +1711,11 @@ async def search_places(
         query: Search query (e.g., "pizza restaurants", "gas stations")
         location: Optional center point as "lat,lng" (e.g., "37.7749,-122.4194")
         radius: Optional search radius in meters (max 50000)
+        limit: Maximum number of places to return (default 5, max 60)
+        cursor: Optional "Next cursor" from a previous call with the same query, to get the following results
+        output_format: Optional "text" or "json" (compact structured output)
     """
+    
     params = {"query": query}
     
     if location:
@@ -99,73 +1723,204 @@ async def search_places(
     if radius:
         params["radius"] = str(radius)
     
-    data = await make_google_request("place/textsearch/json", params)
+    try:
+        page_token, offset = decode_cursor(cursor) if cursor else (None, 0)
+    except ValueError:
+        return render_error("Invalid cursor. Pass the Next cursor value from a previous search_places call.", output_format)
+    limit = max(1, min(limit, SEARCH_MAX_RESULTS))
     
-    if not data or not data.get("results"):
-        return "No places found for the search query."
+    results = []
+    next_cursor = None
+    prefetch_token = None
+    while len(results) < limit:
+        data = await search_page(params, page_token)
+        page = data.get("results", []) if data else []
+        taken = page[offset:offset + limit - len(results)]
+        results.extend(taken)
+        offset += len(taken)
+        next_page_token = data.get("next_page_token") if data else None
+        
+        if offset < len(page):
+            next_cursor = encode_cursor(page_token, offset)
+            # The following call will finish this page, so the one after
+            # it needs the next Google page
+            prefetch_token = next_page_token if len(page) - offset <= limit else None
+            break
+        if not next_page_token:
+            next_cursor = prefetch_token = None
+            break
+        # Stopping here leaves the cursor at the start of an unfetched page
+        page_token, offset = next_page_token, 0
+        next_cursor = encode_cursor(page_token, offset)
+        prefetch_token = page_token
     
-    places = []
-    for place in data["results"][:5]:  # Limit to 5 results
-        place_info = f"""
-Name: {place['name']}
-Address: {place.get('formatted_address', 'Address not available')}
-Rating: {place.get('rating', 'No rating')} stars
-Types: {', '.join(place.get('types', []))}
-Place ID: {place['place_id']}
+    if not results:
+        return render_error("No places found for the search query.", output_format)
+    
+    # Warm the next Google page before a following call needs it
+    if SEARCH_PREFETCH_ENABLED and prefetch_token:
+        prefetch_search_page(params, prefetch_token)
+    
+    if DETAILS_PREFETCH_TOP_K > 0:
+        prefetch_place_details([place['place_id'] for place in results])
+    
+    payload = {
+        "places": [
+            {
+                "name": place["name"],
+                "address": place.get("formatted_address"),
+                "rating": place.get("rating"),
+                "types": place.get("types", []),
+                "place_id": place["place_id"],
+            }
+            for place in results
+        ],
+        "next_cursor": next_cursor,
+    }
+    return render(payload, format_search_places, output_format)
+
+def place_details_payload(place: Dict[str, Any], compact: bool = False) -> Dict[str, Any]:
+    """Structured place details; `compact` drops weekly hours and reviews."""
+    hours = place.get("opening_hours")
+    payload = {
+        "name": place.get("name"),
+        "address": place.get("formatted_address"),
+        "phone": place.get("formatted_phone_number"),
+        "website": place.get("website"),
+        "rating": place.get("rating"),
+        "open_now": hours.get("open_now", False) if hours else None,
+    }
+    if not compact:
+        payload["opening_hours"] = hours.get("weekday_text", []) if hours else []
+        payload["reviews"] = [
+            {
+                "author": review["author_name"],
+                "rating": review["rating"],
+                "text": review["text"][:200],
+            }
+            for review in place.get("reviews", [])[:3]  # Show 3 most recent reviews
+        ]
+    return payload
+
+def format_place_details(payload: Dict[str, Any]) -> str:
+    details = f"""
+Name: {payload['name'] or 'Unknown'}
+Address: {payload['address'] or 'Address not available'}
+Phone: {payload['phone'] or 'Phone not available'}
+Website: {payload['website'] or 'Website not available'}
+Rating: {payload['rating'] or 'No rating'} stars
+"""
+    
+    # Add opening hours if available
+    if payload['open_now'] is not None:
+        if payload['opening_hours']:
+            details += f"\nOpening Hours:\n" + "\n".join(payload['opening_hours'])
+        details += f"\nCurrently Open: {'Yes' if payload['open_now'] else 'No'}"
+    
+    # Add recent reviews if available
+    if payload['reviews']:
+        details += f"\n\nRecent Reviews:"
+        for review in payload['reviews']:
+            details += f"""
+- {review['author']} ({review['rating']} stars): {review['text']}...
 """
-        places.append(place_info)
     
-    return "\n---\n".join(places)
+    return details
 
 @mcp.tool()
-async def get_place_details(place_id: str) -> str:
+@instrumented
+async def get_place_details(place_id: str, output_format: Optional[OutputFormat] = None) -> str:
     """Get detailed information about a specific place.
     
     Args:
         place_id: The Google Places ID for the location
+        output_format: Optional "text" or "json" (compact structured output)
     """
-    params = {
-        "place_id": place_id,
-        "fields": "name,formatted_address,formatted_phone_number,website,rating,reviews,opening_hours,geometry"
-    }
     
-    data = await make_google_request("place/details/json", params)
+    place = await place_details(place_id)
     
-    if not data or not data.get("result"):
-        return "Unable to fetch place details."
+    if not place:
+        return render_error("Unable to fetch place details.", output_format)
     
-    place = data["result"]
+    return render(place_details_payload(place), format_place_details, output_format)
+
+def format_batch_place_details(payload: Dict[str, Any]) -> str:
+    entries = []
+    for i, place in enumerate(payload["places"], 1):
+        if place.get("status") == "pending":
+            entries.append(f"{i}. {place['place_id']}\n{PENDING_NOTE}")
+            continue
+        if "error" in place:
+            entries.append(f"{i}. {place['place_id']}\n{place['error']}")
+            continue
+        details = (
+            f"{i}. {place['name'] or 'Unknown'}\n"
+            f"Address: {place['address'] or 'Address not available'}\n"
+            f"Phone: {place['phone'] or 'Phone not available'}\n"
+            f"Website: {place['website'] or 'Website not available'}\n"
+            f"Rating: {place['rating'] or 'No rating'} stars"
+        )
+        if place['open_now'] is not None:
+            details += f"\nCurrently Open: {'Yes' if place['open_now'] else 'No'}"
+        entries.append(f"{details}\nPlace ID: {place['place_id']}")
+    return "\n\n".join(entries)
+
+@mcp.tool()
+@instrumented
+async def batch_get_place_details(
+    place_ids: List[str],
+    concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+    output_format: Optional[OutputFormat] = None,
+    ctx: Context = None
+) -> str:
+    """Get compact details for many places in one call.
     
-    details = f"""
-Name: {place.get('name', 'Unknown')}
-Address: {place.get('formatted_address', 'Address not available')}
-Phone: {place.get('formatted_phone_number', 'Phone not available')}
-Website: {place.get('website', 'Website not available')}
-Rating: {place.get('rating', 'No rating')} stars
-"""
+    Args:
+        place_ids: List of Google Places IDs; results are returned in the same order
+        concurrency: Optional maximum number of lookups in flight (default 10)
+        timeout: Optional seconds to wait before returning partial results
+        output_format: Optional "text" or "json" (compact structured output)
+    """
     
-    # Add opening hours if available
-    if place.get('opening_hours'):
-        hours = place['opening_hours']
-        if hours.get('weekday_text'):
-            details += f"\nOpening Hours:\n" + "\n".join(hours['weekday_text'])
-        details += f"\nCurrently Open: {'Yes' if hours.get('open_now') else 'No'}"
+    unique = list(dict.fromkeys(place_ids))
+    results, finished = await map_bounded(place_details, unique, concurrency, progress_reporter(ctx), timeout)
+    places = dict(zip(unique, zip(results, finished)))
     
-    # Add recent reviews if available
-    if place.get('reviews'):
-        details += f"\n\nRecent Reviews:"
-        for review in place['reviews'][:3]:  # Show 3 most recent reviews
-            details += f"""
-- {review['author_name']} ({review['rating']} stars): {review['text'][:200]}...
+    entries = []
+    for place_id in place_ids:
+        place, done = places[place_id]
+        if not done:
+            entries.append({"place_id": place_id, "status": "pending"})
+        elif not place:
+            entries.append({"place_id": place_id, "error": "Unable to fetch place details."})
+        else:
+            entries.append({**place_details_payload(place, compact=True), "place_id": place_id})
+    
+    return render({"places": entries, "partial": not all(finished)}, format_batch_place_details, output_format)
+
+def format_directions(payload: Dict[str, Any]) -> str:
+    directions = f"""
+Route Summary: {payload['summary']}
+Distance: {payload['distance']}
+Duration: {payload['duration']}
+Travel Mode: {payload['mode'].title()}
+
+Turn-by-Turn Directions:
 """
     
-    return details
+    for i, step in enumerate(payload["steps"], 1):
+        directions += f"{i}. {step['instruction']} ({step['distance']}, {step['duration']})\n"
+    
+    return directions
 
 @mcp.tool()
+@instrumented
 async def get_directions(
     origin: str, 
     destination: str, 
-    mode: str = "driving"
+    mode: str = "driving",
+    output_format: Optional[OutputFormat] = None
 ) -> str:
     """Get directions between two locations.
     
@@ -173,9 +1928,11 @@ async def get_directions(
         origin: Starting location (address or coordinates)
         destination: Ending location (address or coordinates)
         mode: Travel mode - "driving", "walking", "bicycling", or "transit"
+        output_format: Optional "text" or "json" (compact structured output)
     """
+    
     if mode not in ["driving", "walking", "bicycling", "transit"]:
-        return "Invalid travel mode. Use: driving, walking, bicycling, or transit"
+        return render_error("Invalid travel mode. Use: driving, walking, bicycling, or transit", output_format)
     
     params = {
         "origin": origin,
@@ -186,32 +1943,73 @@ async def get_directions(
     data = await make_google_request("directions/json", params)
     
     if not data or not data.get("routes"):
-        return "Unable to find directions for the specified route."
+        return render_error("Unable to find directions for the specified route.", output_format)
     
     route = data["routes"][0]
     leg = route["legs"][0]
     
-    directions = f"""
-Route Summary: {route.get('summary', 'Direct route')}
-Distance: {leg['distance']['text']}
-Duration: {leg['duration']['text']}
-Travel Mode: {mode.title()}
-
-Turn-by-Turn Directions:
-"""
-    
-    for i, step in enumerate(leg["steps"][:10], 1):  # Limit to 10 steps
+    steps = []
+    for step in leg["steps"][:10]:  # Limit to 10 steps
         # Remove HTML tags from instructions
         instructions = step["html_instructions"].replace("<b>", "").replace("</b>", "").replace("<div>", " ").replace("</div>", "")
-        directions += f"{i}. {instructions} ({step['distance']['text']}, {step['duration']['text']})\n"
+        steps.append({
+            "instruction": instructions,
+            "distance": step["distance"]["text"],
+            "duration": step["duration"]["text"],
+        })
     
-    return directions
+    payload = {
+        "summary": route.get("summary", "Direct route"),
+        "distance": leg["distance"]["text"],
+        "duration": leg["duration"]["text"],
+        "distance_m": leg["distance"]["value"],
+        "duration_s": leg["duration"]["value"],
+        "mode": mode,
+        "steps": steps,
+    }
+    return render(payload, format_directions, output_format)
+
+def format_distance_matrix(payload: Dict[str, Any]) -> str:
+    lines = [f"Distance Matrix ({payload['mode'].title()} mode):", ""]
+    
+    for origin, row in zip(payload["origins"], payload["rows"]):
+        lines.append(f"From: {origin}")
+        
+        for destination, element in zip(payload["destinations"], row):
+            if "status" not in element:
+                lines.append(f"  To {destination}: {element['distance']} ({element['duration']})")
+            elif element["status"] == "PENDING":
+                lines.append(f"  To {destination}: {PENDING_NOTE}")
+            elif element["status"] in RETRYABLE_GOOGLE_STATUSES:
+                lines.append(f"  To {destination}: Lookup failed ({element['status']})")
+            else:
+                lines.append(f"  To {destination}: Route not available ({element['status']})")
+        
+        lines.append("")
+    
+    if payload["failed_cells"]:
+        lines.append(f"{payload['failed_cells']} routes could not be fetched from Google Maps; retry the call for those cells.")
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
+def distance_matrix_table(payload: Dict[str, Any]) -> Iterable[List[Any]]:
+    """Grid with one row per origin and one column per destination; cells without a route hold their status."""
+    yield ["origin", *payload["destinations"]]
+    for origin, row in zip(payload["origins"], payload["rows"]):
+        yield [
+            origin,
+            *(element["status"] if "status" in element else f"{element['distance']} ({element['duration']})" for element in row)
+        ]
 
 @mcp.tool()
+@instrumented
 async def calculate_distance_matrix(
     origins: List[str], 
     destinations: List[str], 
-    mode: str = "driving"
+    mode: str = "driving",
+    timeout: Optional[float] = None,
+    output_format: Optional[TableOutputFormat] = None,
+    ctx: Context = None
 ) -> str:
     """Calculate travel distances and times between multiple origins and destinations.
     
@@ -219,65 +2017,327 @@ async def calculate_distance_matrix(
         origins: List of origin locations
         destinations: List of destination locations  
         mode: Travel mode - "driving", "walking", "bicycling", or "transit"
+        timeout: Optional seconds to wait before returning partial results
+        output_format: Optional "text", "json" (compact structured output), "csv" or "tsv" (table)
     """
-    if mode not in ["driving", "walking", "bicycling", "transit"]:
-        return "Invalid travel mode. Use: driving, walking, bicycling, or transit"
     
-    params = {
-        "origins": "|".join(origins),
-        "destinations": "|".join(destinations),
-        "mode": mode
-    }
+    if mode not in ["driving", "walking", "bicycling", "transit"]:
+        return render_error("Invalid travel mode. Use: driving, walking, bicycling, or transit", output_format)
     
-    data = await make_google_request("distancematrix/json", params)
+    data = await lookup_distance_matrix(origins, destinations, mode, progress_reporter(ctx), timeout)
     
     if not data or not data.get("rows"):
-        return "Unable to calculate distance matrix."
+        return render_error("Unable to calculate distance matrix.", output_format)
     
-    results = f"Distance Matrix ({mode.title()} mode):\n\n"
+    # Unavailable routes keep only their element status, so a failed lookup
+    # (UNKNOWN_ERROR) stays distinguishable from a missing route (ZERO_RESULTS)
+    rows = [
+        [
+            {
+                "distance": element["distance"]["text"],
+                "duration": element["duration"]["text"],
+                "distance_m": element["distance"].get("value"),
+                "duration_s": element["duration"].get("value"),
+            } if element["status"] == "OK" else {"status": element["status"]}
+            for element in row["elements"]
+        ]
+        for row in data["rows"]
+    ]
+    payload = {
+        "mode": mode,
+        "origins": data["origin_addresses"],
+        "destinations": data["destination_addresses"],
+        "rows": rows,
+        "partial": data["partial"],
+        "failed_cells": data["failed_cells"],
+    }
+    if data["failed_cells"]:
+        _tool_failed.set(True)
+    return render(payload, format_distance_matrix, output_format, distance_matrix_table)
+
+def format_elevation(payload: Dict[str, Any]) -> str:
+    lines = ["Elevation Data:", ""]
     
-    for i, origin in enumerate(data["origin_addresses"]):
-        results += f"From: {origin}\n"
-        
-        for j, destination in enumerate(data["destination_addresses"]):
-            element = data["rows"][i]["elements"][j]
-            
-            if element["status"] == "OK":
-                results += f"  To {destination}: {element['distance']['text']} ({element['duration']['text']})\n"
-            else:
-                results += f"  To {destination}: Route not available\n"
-        
-        results += "\n"
+    for i, result in enumerate(payload["results"]):
+        lines.append(f"Location {i+1}: {result['lat']}, {result['lng']}")
+        if result.get("status") == "pending":
+            lines.append(PENDING_NOTE)
+            lines.append("")
+            continue
+        if "error" in result:
+            lines.append(result["error"])
+            lines.append("")
+            continue
+        lines.append(f"Elevation: {result['elevation_m']:.2f} meters ({result['elevation_m'] * 3.28084:.2f} feet)")
+        lines.append(f"Resolution: {result['resolution_m']:.2f} meters")
+        lines.append("")
     
-    return results
+    return "\n".join(lines) + "\n"
+
+def elevation_table(payload: Dict[str, Any]) -> Iterable[List[Any]]:
+    """One row per location; the status column is UNKNOWN_ERROR or PENDING for points without data."""
+    yield ["lat", "lng", "elevation_m", "resolution_m", "status"]
+    for result in payload["results"]:
+        if result.get("status") == "pending":
+            yield [result["lat"], result["lng"], "", "", "PENDING"]
+        elif "error" in result:
+            yield [result["lat"], result["lng"], "", "", "UNKNOWN_ERROR"]
+        else:
+            yield [result["lat"], result["lng"], result["elevation_m"], result["resolution_m"], "OK"]
 
 @mcp.tool()
-async def get_elevation(locations: List[Dict[str, float]]) -> str:
+@instrumented
+async def get_elevation(
+    locations: List[Dict[str, float]],
+    timeout: Optional[float] = None,
+    output_format: Optional[TableOutputFormat] = None,
+    ctx: Context = None
+) -> str:
     """Get elevation data for specific coordinates.
     
     Args:
         locations: List of coordinate dictionaries with 'lat' and 'lng' keys
                   Example: [{"lat": 37.7749, "lng": -122.4194}]
+        timeout: Optional seconds to wait before returning partial results
+        output_format: Optional "text", "json" (compact structured output), "csv" or "tsv" (table)
     """
-    # Convert locations to string format
-    location_strings = [f"{loc['lat']},{loc['lng']}" for loc in locations]
     
-    params = {"locations": "|".join(location_strings)}
+    elevations, finished = await lookup_elevations(locations, progress_reporter(ctx), timeout)
     
-    data = await make_google_request("elevation/json", params)
+    if not any(elevations):
+        return render_error("Unable to fetch elevation data.", output_format)
     
-    if not data or not data.get("results"):
-        return "Unable to fetch elevation data."
+    results = []
+    for loc, result, done in zip(locations, elevations, finished):
+        if not done:
+            results.append({"lat": loc["lat"], "lng": loc["lng"], "status": "pending"})
+        elif result is None:
+            results.append({"lat": loc["lat"], "lng": loc["lng"], "error": "Elevation not available"})
+        else:
+            results.append({
+                "lat": result["location"]["lat"],
+                "lng": result["location"]["lng"],
+                "elevation_m": result["elevation"],
+                "resolution_m": result["resolution"],
+            })
+    payload = {"results": results, "partial": not all(finished)}
+    return render(payload, format_elevation, output_format, elevation_table)
+
+@mcp.resource("stats://prefetch")
+def prefetch_stats() -> str:
+    """Hit rate of the speculative place details prefetch."""
+    stats = {
+        result: metrics.value("google_maps_details_prefetch_total", {"result": result})
+        for result in ("prefetched", "hits", "skipped_budget")
+    }
+    hit_rate = stats["hits"] / stats["prefetched"] if stats["prefetched"] else 0.0
+    return (
+        f"Details prefetch top K: {DETAILS_PREFETCH_TOP_K}\n"
+        f"Prefetched: {stats['prefetched']}\n"
+        f"Hits: {stats['hits']}\n"
+        f"Hit rate: {hit_rate:.1%}\n"
+        f"Skipped (budget): {stats['skipped_budget']}\n"
+    )
+
+@mcp.resource("metrics://google-maps")
+def metrics_text() -> str:
+    """Request counts, cache hit rates, retries and latency histograms in Prometheus text format."""
+    return metrics.render()
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics_endpoint(request: Request) -> Response:
+    """Prometheus scrape endpoint, served alongside the sse and streamable-http transports."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# Optional host-wide sidecar that owns the connection pool, rate limiters and
+# a shared response cache. Server processes started with
+# GOOGLE_MAPS_DAEMON_SOCKET set forward every upstream request to it as
+# newline-delimited JSON over a Unix socket.
+DAEMON_SOCKET = os.getenv("GOOGLE_MAPS_DAEMON_SOCKET")
+DAEMON_MAX_MESSAGE = 64 * 1024 * 1024
+# Longest the daemon works on a request, including time queued on its
+# host-wide rate limiters, before answering with a timeout error
+DAEMON_REQUEST_TIMEOUT = float(os.getenv("GOOGLE_MAPS_DAEMON_REQUEST_TIMEOUT", "300"))
+DAEMON_CACHE_TTLS: Dict[str, float] = {
+    **DISK_CACHE_TTLS,
+    "place/textsearch/json": 300.0,
+    "directions/json": 900.0,
+    "distancematrix/json": DISTANCE_MATRIX_CACHE_BUCKET,
+}
+_daemon_cache = TTLCache(
+    max_entries=int(os.getenv("GOOGLE_MAPS_DAEMON_CACHE_SIZE", "200000")),
+    max_bytes=int(os.getenv("GOOGLE_MAPS_DAEMON_CACHE_BYTES", str(512 * 1024 * 1024))),
+    ttl=3600,
+)
+
+class DaemonClient:
+    """Forwards requests to the cache daemon, multiplexed over one Unix socket connection."""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._writer: asyncio.StreamWriter | None = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count()
+        self._lock = asyncio.Lock()
+    
+    async def _connect(self) -> None:
+        if self._writer is not None and not self._writer.is_closing():
+            return
+        reader, self._writer = await asyncio.open_unix_connection(self.path, limit=DAEMON_MAX_MESSAGE)
+        # Each connection gets its own pending table so a dying connection
+        # only fails the requests that were sent on it
+        self._pending = {}
+        task = asyncio.ensure_future(self._read_responses(reader, self._pending))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
     
-    results = "Elevation Data:\n\n"
+    async def _read_responses(self, reader: asyncio.StreamReader, pending: Dict[int, asyncio.Future]) -> None:
+        try:
+            while line := await reader.readline():
+                message = json.loads(line)
+                future = pending.pop(message["id"], None)
+                if future is not None and not future.done():
+                    future.set_result(message)
+        except (OSError, ValueError) as e:
+            print(f"Cache daemon connection failed: {e}", file=sys.stderr)
+        finally:
+            # Answered as a daemon error rather than an OSError: these requests
+            # were delivered, so the caller must not send them upstream again
+            for future in pending.values():
+                if not future.done():
+                    future.set_result({"error": "Cache daemon connection closed"})
+            pending.clear()
+    
+    async def request(self, endpoint: str, params: Dict[str, Any], elements: int | None) -> Dict[str, Any] | None:
+        """Send a request to the daemon and wait for its answer.
+        
+        Raises OSError only if the request could not be delivered; a request
+        the daemon accepted is never retried here, since it may already have
+        been sent upstream.
+        """
+        async with self._lock:
+            await self._connect()
+            request_id = next(self._ids)
+            future = asyncio.get_running_loop().create_future()
+            self._pending[request_id] = future
+            message = {"id": request_id, "endpoint": endpoint, "params": params, "elements": elements}
+            self._writer.write(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+            await self._writer.drain()
+        # The daemon enforces DAEMON_REQUEST_TIMEOUT itself; this only guards
+        # against a daemon that stopped answering on a live connection
+        try:
+            message = await asyncio.wait_for(future, DAEMON_REQUEST_TIMEOUT + HTTP_TIMEOUT)
+        except TimeoutError:
+            self._pending.pop(request_id, None)
+            print(f"Cache daemon did not answer within {DAEMON_REQUEST_TIMEOUT + HTTP_TIMEOUT:g}s", file=sys.stderr)
+            return None
+        if "error" in message:
+            print(f"Cache daemon request failed: {message['error']}", file=sys.stderr)
+            return None
+        return message.get("data")
     
-    for i, result in enumerate(data["results"]):
-        location = result["location"]
-        results += f"Location {i+1}: {location['lat']}, {location['lng']}\n"
-        results += f"Elevation: {result['elevation']:.2f} meters ({result['elevation'] * 3.28084:.2f} feet)\n"
-        results += f"Resolution: {result['resolution']:.2f} meters\n\n"
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+_daemon_client = DaemonClient(DAEMON_SOCKET) if DAEMON_SOCKET else None
+
+async def _handle_daemon_request(message: Dict[str, Any]) -> Dict[str, Any] | None:
+    endpoint, params = message["endpoint"], message["params"]
+    key = request_key(endpoint, params)
+    data = _daemon_cache.get(key)
+    record_cache("daemon", data is not None)
+    if data is None:
+        data = await make_google_request(endpoint, params, message.get("elements"))
+        ttl = DAEMON_CACHE_TTLS.get(endpoint)
+        if data is not None and ttl:
+            _daemon_cache.set(key, data, ttl)
+    return data
+
+async def _serve_daemon_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    write_lock = asyncio.Lock()
+    tasks: set[asyncio.Task] = set()
+    
+    async def respond(message: Dict[str, Any]) -> None:
+        reply: Dict[str, Any] = {"id": message["id"]}
+        try:
+            async with asyncio.timeout(DAEMON_REQUEST_TIMEOUT):
+                reply["data"] = await _handle_daemon_request(message)
+        except TimeoutError:
+            reply["error"] = f"timed out after {DAEMON_REQUEST_TIMEOUT:g}s"
+        except Exception as e:
+            print(f"Cache daemon request failed: {e!r}", file=sys.stderr)
+            reply["error"] = repr(e)
+        line = json.dumps(reply, separators=(",", ":")).encode() + b"\n"
+        async with write_lock:
+            writer.write(line)
+            await writer.drain()
+    
+    try:
+        while line := await reader.readline():
+            task = asyncio.ensure_future(respond(json.loads(line)))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    except (OSError, ValueError) as e:
+        print(f"Cache daemon client error: {e}", file=sys.stderr)
+    finally:
+        for task in tasks:
+            task.cancel()
+        writer.close()
+
+async def run_daemon(path: str) -> None:
+    """Serve the cache daemon on a Unix socket until cancelled."""
+    if os.path.exists(path):
+        os.unlink(path)
+    server = await asyncio.start_unix_server(_serve_daemon_connection, path, limit=DAEMON_MAX_MESSAGE)
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    print(f"Google Maps cache daemon listening on {path}", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await close_http_client()
+        if _disk_cache is not None:
+            _disk_cache.close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+def main() -> None:
+    global _daemon_client
+    parser = argparse.ArgumentParser(description="Google Maps MCP server")
+    parser.add_argument(
+        "--transport",
+        choices=["stdio", "sse", "streamable-http"],
+        default=os.getenv("GOOGLE_MAPS_TRANSPORT", "stdio"),
+        help="stdio for a single client, or sse/streamable-http to serve many clients from one process"
+    )
+    parser.add_argument("--host", default=os.getenv("GOOGLE_MAPS_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("GOOGLE_MAPS_PORT", "8000")))
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Run the shared cache daemon on --socket instead of an MCP server"
+    )
+    parser.add_argument("--socket", default=DAEMON_SOCKET, help="Unix socket path of the cache daemon")
+    args = parser.parse_args()
+    
+    if args.daemon:
+        if not args.socket:
+            parser.error("--daemon requires --socket or GOOGLE_MAPS_DAEMON_SOCKET")
+        _daemon_client = None
+        try:
+            asyncio.run(run_daemon(args.socket))
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            pass
+        return
+    if args.socket and _daemon_client is None:
+        _daemon_client = DaemonClient(args.socket)
     
-    return results
+    # All sessions share this process's connection pool, caches and rate limiters
+    mcp.settings.host = args.host
+    mcp.settings.port = args.port
+    mcp.run(transport=args.transport)
 
 if __name__ == "__main__":
-    mcp.run(transport="stdio")
+    main()
@@ -0,0 +1,238 @@
+"""Replay a JSONL log of tool invocations against the Google Maps MCP server.
+
+Each line of the log is one tool call:
+
+    {"tool": "geocode_address", "arguments": {"address": "1600 Amphitheatre Parkway"}, "timestamp": 12.5}
+
+"timestamp" (seconds, any origin) is only needed to replay at the recorded
+timings; lines without a "tool" key are skipped. The server is spawned over
+stdio, or reached over HTTP when it runs with --transport sse/streamable-http.
+Run the server with GOOGLE_MAPS_CASSETTE_MODE=replay for load tests that
+never touch the real API. Tool results carrying an error message count as
+errors, and cache hit rates are read from the server's metrics at the end.
+With --rate or --timing recorded, latency is measured from each call's
+scheduled send time, so time spent waiting for a concurrency slot while the
+server falls behind shows up in the percentiles, and the report says how far
+sends slipped behind the schedule.
+
+    uv run loadgen.py calls.jsonl --concurrency 20 --rate 50
+    uv run loadgen.py calls.jsonl --transport streamable-http --url http://127.0.0.1:8000/mcp --timing recorded
+"""
+import argparse
+import asyncio
+import bisect
+import json
+import os
+import re
+import statistics
+import sys
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.types import CallToolResult
+from mcp.client.sse import sse_client
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+from pydantic import AnyUrl
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+HISTOGRAM_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf")]
+
+# The tools report failures as ordinary results: {"error": ...} in JSON output,
+# or one of these messages in text output
+ERROR_PREFIXES = ("Unable to ", "No places found", "Invalid ")
+
+METRICS_URI = AnyUrl("metrics://google-maps")
+CACHE_METRIC = re.compile(r'^google_maps_cache_requests_total\{cache="([^"]*)",result="(hit|miss)"\} (\S+)$', re.MULTILINE)
+
+def load_calls(path: str) -> List[Dict[str, Any]]:
+    calls = []
+    skipped = 0
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if "tool" not in entry:
+                skipped += 1
+                continue
+            calls.append(entry)
+    if skipped:
+        print(f"Skipped {skipped} lines without a 'tool' key", file=sys.stderr)
+    return calls
+
+@asynccontextmanager
+async def connect(args: argparse.Namespace) -> AsyncIterator[ClientSession]:
+    """Open one initialized MCP client session to the server under test."""
+    async with AsyncExitStack() as stack:
+        if args.transport == "stdio":
+            server = StdioServerParameters(
+                command=sys.executable,
+                args=[os.path.join(os.path.dirname(os.path.abspath(__file__)), "google_maps.py")],
+                env=dict(os.environ),
+            )
+            read, write = await stack.enter_async_context(stdio_client(server))
+        elif args.transport == "sse":
+            read, write = await stack.enter_async_context(sse_client(args.url))
+        else:
+            read, write, _ = await stack.enter_async_context(streamablehttp_client(args.url))
+        session = await stack.enter_async_context(ClientSession(read, write))
+        await session.initialize()
+        yield session
+
+def is_error(result: CallToolResult) -> bool:
+    if result.isError:
+        return True
+    text = "".join(getattr(content, "text", "") for content in result.content).strip()
+    if text.startswith("{"):
+        try:
+            return "error" in json.loads(text)
+        except ValueError:
+            return False
+    return text.startswith(ERROR_PREFIXES)
+
+async def read_cache_stats(sessions: List[ClientSession]) -> Dict[str, List[float]]:
+    """Sum the server's cache hit and miss counters across the given sessions."""
+    caches: Dict[str, List[float]] = {}
+    for session in sessions:
+        try:
+            result = await session.read_resource(METRICS_URI)
+        except Exception as e:
+            print(f"Could not read {METRICS_URI}: {e!r}", file=sys.stderr)
+            continue
+        text = "".join(getattr(content, "text", "") for content in result.contents)
+        for cache, outcome, value in CACHE_METRIC.findall(text):
+            caches.setdefault(cache, [0.0, 0.0])[outcome == "miss"] += float(value)
+    return caches
+
+class ToolStats:
+    def __init__(self) -> None:
+        self.latencies_ms: List[float] = []
+        self.errors = 0
+        self.histogram = [0] * len(HISTOGRAM_BUCKETS_MS)
+    
+    def record(self, latency_ms: float, error: bool) -> None:
+        self.latencies_ms.append(latency_ms)
+        self.histogram[bisect.bisect_left(HISTOGRAM_BUCKETS_MS, latency_ms)] += 1
+        if error:
+            self.errors += 1
+
+def percentile(values: List[float], q: int) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+async def replay(
+    args: argparse.Namespace,
+    calls: List[Dict[str, Any]]
+) -> tuple[Dict[str, ToolStats], Dict[str, List[float]]]:
+    stats: Dict[str, ToolStats] = {}
+    semaphore = asyncio.Semaphore(args.concurrency)
+    
+    async with AsyncExitStack() as stack:
+        sessions = [await stack.enter_async_context(connect(args)) for _ in range(args.sessions)]
+        
+        lags_ms: List[float] = []
+        
+        async def invoke(i: int, call: Dict[str, Any], scheduled: float | None) -> None:
+            async with semaphore:
+                session = sessions[i % len(sessions)]
+                sent = time.perf_counter()
+                if scheduled is not None:
+                    lags_ms.append(max(0.0, sent - scheduled) * 1000)
+                started = sent if scheduled is None else scheduled
+                try:
+                    result = await asyncio.wait_for(
+                        session.call_tool(call["tool"], call.get("arguments", {})), args.timeout
+                    )
+                    error = is_error(result)
+                except Exception as e:
+                    print(f"{call['tool']} failed: {e!r}", file=sys.stderr)
+                    error = True
+                latency_ms = (time.perf_counter() - started) * 1000
+                stats.setdefault(call["tool"], ToolStats()).record(latency_ms, error)
+        
+        # Schedule each call at its offset: recorded timings, a fixed rate, or
+        # as fast as the concurrency limit allows
+        if args.timing == "recorded":
+            first = calls[0].get("timestamp", 0.0) if calls else 0.0
+            offsets = [(call.get("timestamp", first) - first) / args.speed for call in calls]
+        elif args.rate:
+            offsets = [i / args.rate for i in range(len(calls))]
+        else:
+            offsets = None
+        
+        started = time.perf_counter()
+        tasks = []
+        for i, call in enumerate(calls):
+            scheduled = started + offsets[i] if offsets else None
+            if scheduled is not None and scheduled > time.perf_counter():
+                await asyncio.sleep(scheduled - time.perf_counter())
+            tasks.append(asyncio.ensure_future(invoke(i, call, scheduled)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+        
+        # Each stdio session is its own server process; over HTTP they all
+        # share one, so its counters are read once
+        caches = await read_cache_stats(sessions if args.transport == "stdio" else sessions[:1])
+    
+    print(f"Replayed {len(calls)} calls in {elapsed:.2f}s ({len(calls) / elapsed:.1f} calls/s)")
+    if lags_ms:
+        print(
+            f"Behind schedule: p50 {percentile(lags_ms, 50):.1f} ms, p99 {percentile(lags_ms, 99):.1f} ms, "
+            f"max {max(lags_ms):.1f} ms; {sum(lag > 1 for lag in lags_ms)} of {len(lags_ms)} calls sent more than 1 ms late"
+        )
+    print()
+    return stats, caches
+
+def print_report(stats: Dict[str, ToolStats], caches: Dict[str, List[float]]) -> None:
+    header = f"{'tool':<26} {'calls':>6} {'errors':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+    print(header)
+    print("-" * len(header))
+    for tool, s in sorted(stats.items()):
+        print(
+            f"{tool:<26} {len(s.latencies_ms):>6} {s.errors:>6} {percentile(s.latencies_ms, 50):>9.1f} "
+            f"{percentile(s.latencies_ms, 95):>9.1f} {percentile(s.latencies_ms, 99):>9.1f} {max(s.latencies_ms):>9.1f}"
+        )
+    
+    for tool, s in sorted(stats.items()):
+        print(f"\n{tool} latency histogram:")
+        lower = 0
+        for bound, count in zip(HISTOGRAM_BUCKETS_MS, s.histogram):
+            if count:
+                label = f"{lower}-{bound} ms" if bound != float("inf") else f">{lower} ms"
+                bar = "#" * max(1, round(40 * count / len(s.latencies_ms)))
+                print(f"  {label:>14} {count:>6} {bar}")
+            lower = bound
+    
+    if caches:
+        print(f"\n{'cache':<26} {'hits':>8} {'misses':>8} {'hit rate':>9}")
+        for cache, (hits, misses) in sorted(caches.items()):
+            print(f"{cache:<26} {hits:>8g} {misses:>8g} {hits / (hits + misses):>9.1%}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay a JSONL log of tool calls against the Google Maps MCP server")
+    parser.add_argument("log", help="JSONL file with one {\"tool\", \"arguments\", \"timestamp\"} object per line")
+    parser.add_argument("--transport", choices=["stdio", "sse", "streamable-http"], default="stdio")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/mcp", help="Server URL for the HTTP transports")
+    parser.add_argument("--sessions", type=int, default=1, help="Client sessions to spread calls over")
+    parser.add_argument("--concurrency", type=int, default=10, help="Maximum calls in flight")
+    parser.add_argument("--timing", choices=["asap", "recorded"], default="asap", help="Send as fast as allowed or at recorded timestamps")
+    parser.add_argument("--speed", type=float, default=1.0, help="Speed-up factor for recorded timings")
+    parser.add_argument("--rate", type=float, help="Fixed send rate in calls/s (asap timing only)")
+    parser.add_argument("--limit", type=int, help="Replay only the first N calls")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-call timeout in seconds")
+    args = parser.parse_args()
+    
+    calls = load_calls(args.log)[:args.limit]
+    if not calls:
+        parser.error(f"no tool calls found in {args.log}")
+    
+    stats, caches = asyncio.run(replay(args, calls))
+    print_report(stats, caches)
+
+if __name__ == "__main__":
+    main()
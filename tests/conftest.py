@@ -0,0 +1,3 @@
+# The benchmark module sets the offline configuration the server reads at
+# import time (dummy API key, no rate limits, short retry delays)
+import benchmark  # noqa: F401
@@ -0,0 +1,65 @@
+import asyncio
+
+import httpx
+
+import google_maps
+
+def counting_geocoder(calls: list[str], delay: float):
+    async def handle(request: httpx.Request) -> httpx.Response:
+        address = request.url.params["address"]
+        calls.append(address)
+        await asyncio.sleep(delay)
+        result = {"formatted_address": address, "geometry": {"location": {"lat": 1.0, "lng": 2.0}}, "place_id": address}
+        return httpx.Response(200, json={"status": "OK", "results": [result]})
+    
+    return handle
+
+def run(handler, main):
+    async def wrapper():
+        google_maps._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            return await main()
+        finally:
+            await google_maps.close_http_client()
+    
+    return asyncio.run(wrapper())
+
+def test_concurrent_identical_requests_share_one_upstream_call():
+    calls: list[str] = []
+    
+    async def main():
+        return await asyncio.gather(*(
+            google_maps.make_google_request("geocode/json", {"address": "1 Shared Street"}) for _ in range(10)
+        ))
+    
+    results = run(counting_geocoder(calls, 0.05), main)
+    assert calls == ["1 Shared Street"]
+    assert all(result == results[0] for result in results)
+    assert not google_maps._inflight
+
+def test_cancelled_caller_does_not_cancel_shared_request():
+    calls: list[str] = []
+    
+    async def main():
+        first = asyncio.ensure_future(google_maps.make_google_request("geocode/json", {"address": "2 Shared Street"}))
+        second = asyncio.ensure_future(google_maps.make_google_request("geocode/json", {"address": "2 Shared Street"}))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        return await second, first.cancelled()
+    
+    data, first_cancelled = run(counting_geocoder(calls, 0.2), main)
+    assert first_cancelled
+    assert data["results"][0]["place_id"] == "2 Shared Street"
+    assert calls == ["2 Shared Street"]
+
+def test_last_cancelled_caller_cancels_upstream_request():
+    calls: list[str] = []
+    
+    async def main():
+        caller = asyncio.ensure_future(google_maps.make_google_request("geocode/json", {"address": "3 Shared Street"}))
+        await asyncio.sleep(0.05)
+        caller.cancel()
+        await asyncio.sleep(0.05)
+        return dict(google_maps._inflight)
+    
+    assert run(counting_geocoder(calls, 5.0), main) == {}
@@ -0,0 +1,60 @@
+import asyncio
+
+import httpx
+
+import google_maps
+
+def run_against_daemon(tmp_path, monkeypatch, serve) -> tuple[dict | None, list[str]]:
+    """Dispatch one request through a DaemonClient connected to a fake daemon."""
+    upstream_calls: list[str] = []
+    
+    def handle(request: httpx.Request) -> httpx.Response:
+        upstream_calls.append(request.url.params["address"])
+        return httpx.Response(200, json={"status": "OK", "results": []})
+    
+    async def run() -> dict | None:
+        path = str(tmp_path / "daemon.sock")
+        server = await asyncio.start_unix_server(serve, path)
+        monkeypatch.setattr(google_maps, "_daemon_client", google_maps.DaemonClient(path))
+        google_maps._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+        try:
+            params = {"address": "1 Daemon Way"}
+            key = google_maps.request_key("geocode/json", params)
+            return await google_maps._dispatch_request(key, "geocode/json", params)
+        finally:
+            await google_maps._daemon_client.close()
+            await google_maps.close_http_client()
+            server.close()
+            await server.wait_closed()
+    
+    return asyncio.run(run()), upstream_calls
+
+def test_connection_lost_after_delivery_is_not_resent_locally(tmp_path, monkeypatch):
+    async def drop_after_read(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        await reader.readline()
+        writer.close()
+    
+    data, upstream_calls = run_against_daemon(tmp_path, monkeypatch, drop_after_read)
+    assert data is None
+    assert upstream_calls == []
+
+def test_unreachable_daemon_falls_back_to_local_request(tmp_path, monkeypatch):
+    async def run() -> tuple[dict | None, list[str]]:
+        upstream_calls: list[str] = []
+        
+        def handle(request: httpx.Request) -> httpx.Response:
+            upstream_calls.append(request.url.params["address"])
+            return httpx.Response(200, json={"status": "OK", "results": []})
+        
+        monkeypatch.setattr(google_maps, "_daemon_client", google_maps.DaemonClient(str(tmp_path / "missing.sock")))
+        google_maps._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+        try:
+            params = {"address": "2 Daemon Way"}
+            key = google_maps.request_key("geocode/json", params)
+            return await google_maps._dispatch_request(key, "geocode/json", params), upstream_calls
+        finally:
+            await google_maps.close_http_client()
+    
+    data, upstream_calls = asyncio.run(run())
+    assert data == {"status": "OK", "results": []}
+    assert upstream_calls == ["2 Daemon Way"]
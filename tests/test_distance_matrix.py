@@ -0,0 +1,167 @@
+import asyncio
+from urllib.parse import quote
+
+import httpx
+import pytest
+
+import google_maps
+from google_maps import chunk_pipe_list
+
+def test_chunk_pipe_list_respects_max_items():
+    items = [f"place {i}" for i in range(60)]
+    chunks = chunk_pipe_list(items, 25, 10000)
+    assert [len(chunk) for chunk in chunks] == [25, 25, 10]
+    assert [item for chunk in chunks for item in chunk] == items
+
+def test_chunk_pipe_list_respects_max_length():
+    items = ["a" * 10] * 10
+    chunks = chunk_pipe_list(items, 100, 40)
+    # Each "|" separator counts as the three characters of its URL encoding
+    assert [len(chunk) for chunk in chunks] == [3, 3, 3, 1]
+    assert all(len(quote("|".join(chunk), safe=",")) <= 40 for chunk in chunks)
+
+def test_chunk_pipe_list_keeps_oversized_item_alone():
+    chunks = chunk_pipe_list(["short", "x" * 100, "short"], 25, 50)
+    assert chunks == [["short"], ["x" * 100], ["short"]]
+
+def matrix_backend(requests: list, fail: str | None = None, delay: dict[str, float] | None = None):
+    """Distance Matrix handler that answers every cell with "origin->destination".
+    
+    Tiles containing the `fail` origin get INVALID_REQUEST; tiles containing
+    an origin listed in `delay` are answered after that many seconds.
+    """
+    async def handle(request: httpx.Request) -> httpx.Response:
+        origins = request.url.params["origins"].split("|")
+        destinations = request.url.params["destinations"].split("|")
+        requests.append((origins, destinations))
+        await asyncio.sleep(max((delay or {}).get(o, 0) for o in origins))
+        if fail in origins:
+            return httpx.Response(200, json={"status": "INVALID_REQUEST"})
+        return httpx.Response(200, json={
+            "status": "OK",
+            "origin_addresses": [f"{o} (resolved)" for o in origins],
+            "destination_addresses": [f"{d} (resolved)" for d in destinations],
+            "rows": [
+                {"elements": [{"status": "OK", "distance": {"text": f"{o}->{d}"}} for d in destinations]}
+                for o in origins
+            ],
+        })
+    
+    return handle
+
+@pytest.fixture
+def matrix():
+    """Run lookup_distance_matrix calls against a MockTransport handler."""
+    google_maps._distance_matrix_cache.clear()
+    
+    def lookup(handler, origins: list[str], destinations: list[str], timeout: float | None = None):
+        async def run():
+            google_maps._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            try:
+                return await google_maps.lookup_distance_matrix(origins, destinations, "driving", timeout=timeout)
+            finally:
+                await google_maps.close_http_client()
+        
+        return asyncio.run(run())
+    
+    yield lookup
+    google_maps._distance_matrix_cache.clear()
+
+def cell_texts(result: dict) -> list[list[str]]:
+    return [[element.get("distance", {}).get("text", element["status"]) for element in row["elements"]] for row in result["rows"]]
+
+def test_cached_tiles_are_skipped(matrix):
+    requests = []
+    origins = [f"O{i}" for i in range(10)]
+    destinations = [f"D{i}" for i in range(20)]
+    matrix(matrix_backend(requests), origins[:5], destinations)
+    requests.clear()
+    
+    result = matrix(matrix_backend(requests), origins, destinations)
+    # Only the five uncached origins are requested, never the cached rows
+    assert sorted(o for tile_origins, _ in requests for o in tile_origins) == origins[5:]
+    assert cell_texts(result) == [[f"{o}->{d}" for d in destinations] for o in origins]
+
+def test_cells_are_stitched_in_input_order_after_dedupe(matrix):
+    requests = []
+    origins = ["B Street", "a street", "b  street", "A Street"]
+    destinations = ["Z", "y", " z "]
+    result = matrix(matrix_backend(requests), origins, destinations)
+    assert len(requests) == 1
+    requested_origins, requested_destinations = requests[0]
+    assert len(requested_origins) == 2 and len(requested_destinations) == 2
+    
+    canonical = {google_maps.normalize_address(o): o for o in requested_origins}
+    canonical_destinations = {google_maps.normalize_address(d): d for d in requested_destinations}
+    expected = [
+        [f"{canonical[google_maps.normalize_address(o)]}->{canonical_destinations[google_maps.normalize_address(d)]}" for d in destinations]
+        for o in origins
+    ]
+    assert cell_texts(result) == expected
+    assert len(result["origin_addresses"]) == 4
+    assert len(result["destination_addresses"]) == 3
+
+def test_failed_tiles_are_counted_and_not_partial(matrix):
+    requests = []
+    origins = [f"O{i}" for i in range(8)]
+    destinations = [f"D{i}" for i in range(25)]
+    # 25 destinations allow 4 origins per tile, so O0-O3 and O4-O7 are separate tiles
+    result = matrix(matrix_backend(requests, fail="O5"), origins, destinations)
+    assert len(requests) == 2
+    assert result["partial"] is False
+    assert result["failed_cells"] == 4 * 25
+    assert cell_texts(result)[:4] == [[f"{o}->{d}" for d in destinations] for o in origins[:4]]
+    assert cell_texts(result)[4:] == [["UNKNOWN_ERROR"] * 25] * 4
+
+def test_timed_out_tiles_are_pending_and_partial(matrix):
+    requests = []
+    origins = [f"O{i}" for i in range(8)]
+    destinations = [f"D{i}" for i in range(25)]
+    result = matrix(matrix_backend(requests, delay={"O6": 5.0}), origins, destinations, timeout=0.2)
+    assert result["partial"] is True
+    assert result["failed_cells"] == 0
+    assert cell_texts(result)[4:] == [["PENDING"] * 25] * 4
+
+def test_cached_cells_survive_when_every_tile_fails(matrix):
+    requests = []
+    matrix(matrix_backend(requests), ["O0"], ["D0", "D1"])
+    
+    result = matrix(matrix_backend(requests, fail="O1"), ["O0", "O1"], ["D0", "D1"])
+    assert result is not None
+    assert result["failed_cells"] == 2
+    assert cell_texts(result) == [["O0->D0", "O0->D1"], ["UNKNOWN_ERROR", "UNKNOWN_ERROR"]]
+    
+    google_maps._distance_matrix_cache.clear()
+    assert matrix(matrix_backend(requests, fail="O1"), ["O1"], ["D0"]) is None
+
+def test_mixed_cached_matrix_with_one_failing_tile(matrix):
+    requests = []
+    origins = [f"O{i}" for i in range(30)]
+    destinations = [f"D{i}" for i in range(30)]
+    # Cache a checkerboard of 10x10 blocks so most tiles are partly cached
+    for block_o in range(0, 30, 10):
+        for block_d in range(0, 30, 10):
+            if (block_o + block_d) // 10 % 2 == 0:
+                matrix(matrix_backend(requests), origins[block_o:block_o + 10], destinations[block_d:block_d + 10])
+    requests.clear()
+    
+    result = matrix(matrix_backend(requests, fail="O13"), origins, destinations)
+    failing_cells = {(o, d) for tile_origins, tile_destinations in requests if "O13" in tile_origins
+                     for o in tile_origins for d in tile_destinations}
+    expected = [[f"{o}->{d}" for d in destinations] for o in origins]
+    failed = 0
+    for i, o in enumerate(origins):
+        for j, d in enumerate(destinations):
+            block_cached = (i // 10 + j // 10) % 2 == 0
+            if (o, d) in failing_cells and not block_cached:
+                expected[i][j] = "UNKNOWN_ERROR"
+                failed += 1
+    assert failed > 0
+    assert result["partial"] is False
+    assert result["failed_cells"] == failed
+    assert cell_texts(result) == expected
+    # No requested tile consists only of cached cells
+    for tile_origins, tile_destinations in requests:
+        assert any(
+            (int(o[1:]) // 10 + int(d[1:]) // 10) % 2 == 1 for o in tile_origins for d in tile_destinations
+        )
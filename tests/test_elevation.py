@@ -0,0 +1,40 @@
+from urllib.parse import quote
+
+import google_maps
+from google_maps import chunk_locations, decode_polyline, encode_polyline
+
+def test_encode_polyline_matches_reference():
+    # Example from Google's Encoded Polyline Algorithm documentation
+    points = [(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)]
+    assert encode_polyline(points) == "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+
+def test_encode_polyline_round_trips():
+    points = [(0.0, 0.0), (-33.86785, 151.20732), (89.99999, -179.99999)]
+    assert decode_polyline(encode_polyline(points)) == points
+
+def test_chunk_locations_respects_request_limits():
+    points = [(37.0 + i / 10000, -122.0 + i / 10000) for i in range(2000)]
+    chunks = chunk_locations(points)
+    assert sum(count for count, _ in chunks) == len(points)
+    assert all(count <= google_maps.ELEVATION_MAX_LOCATIONS for count, _ in chunks)
+    assert all(len(quote(value, safe=":,")) <= google_maps.MAX_URL_PARAM_LENGTH for _, value in chunks)
+
+def test_chunk_locations_preserves_order():
+    points = [(round(37.0 + i / 1000, 5), round(-122.0 - i / 1000, 5)) for i in range(1500)]
+    decoded = []
+    for count, value in chunk_locations(points):
+        if value.startswith("enc:"):
+            chunk = decode_polyline(value[4:])
+        else:
+            chunk = [tuple(map(float, point.split(","))) for point in value.split("|")]
+        assert len(chunk) == count
+        decoded.extend(chunk)
+    assert decoded == points
+
+def test_chunk_locations_splits_on_url_length(monkeypatch):
+    monkeypatch.setattr(google_maps, "MAX_URL_PARAM_LENGTH", 200)
+    points = [(37.123456 + i, -122.654321 - i) for i in range(50)]
+    chunks = chunk_locations(points)
+    assert len(chunks) > 1
+    assert sum(count for count, _ in chunks) == len(points)
+    assert all(len(quote(value, safe=":,")) <= 200 for _, value in chunks)
@@ -0,0 +1,40 @@
+from google_maps import TTLCache
+
+def test_ttl_cache_evicts_least_recently_used_entry():
+    cache = TTLCache(max_entries=2, max_bytes=1024, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+def test_ttl_cache_evicts_by_size():
+    cache = TTLCache(max_entries=100, max_bytes=20, ttl=60)
+    cache.set("a", "x" * 10)
+    cache.set("b", "y" * 10)
+    assert cache.get("a") is None
+    assert cache.get("b") == "y" * 10
+
+def test_ttl_cache_skips_values_larger_than_max_bytes():
+    cache = TTLCache(max_entries=100, max_bytes=10, ttl=60)
+    cache.set("a", "small")
+    cache.set("a", "x" * 100)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(max_entries=100, max_bytes=1024, ttl=60)
+    cache.set("fresh", 1)
+    cache.set("stale", 2, ttl=-1)
+    assert cache.get("fresh") == 1
+    assert cache.get("stale") is None
+    assert len(cache) == 1
+
+def test_ttl_cache_pop_removes_entry():
+    cache = TTLCache(max_entries=100, max_bytes=1024, ttl=60)
+    cache.set("a", 1)
+    assert cache.pop("a") == 1
+    assert cache.pop("a") is None
@@ -0,0 +1,43 @@
+import asyncio
+import json
+
+import pytest
+from mcp.server.fastmcp.exceptions import ToolError
+
+import google_maps
+
+TABLE_TOOLS = {"calculate_distance_matrix", "get_elevation"}
+
+def output_format_schema(tool_name: str) -> dict:
+    return google_maps.mcp._tool_manager.get_tool(tool_name).parameters["properties"]["output_format"]
+
+@pytest.mark.parametrize("tool_name", [tool.name for tool in google_maps.mcp._tool_manager.list_tools()])
+def test_tools_advertise_accepted_formats(tool_name):
+    formats = ["text", "json", "csv", "tsv"] if tool_name in TABLE_TOOLS else ["text", "json"]
+    assert {"enum": formats, "type": "string"} in output_format_schema(tool_name)["anyOf"]
+
+@pytest.mark.parametrize("output_format", ["JSON", "xml", "", "csv"])
+def test_tool_rejects_invalid_format_before_any_request(monkeypatch, output_format):
+    async def fail(*args, **kwargs):
+        raise AssertionError("no upstream request expected")
+    
+    monkeypatch.setattr(google_maps, "make_google_request", fail)
+    arguments = {"address": "1600 Amphitheatre Parkway", "output_format": output_format}
+    with pytest.raises(ToolError, match="output_format"):
+        asyncio.run(google_maps.mcp.call_tool("geocode_address", arguments))
+
+def test_distance_matrix_accepts_csv(monkeypatch):
+    async def lookup(origins, destinations, mode, progress=None, timeout=None):
+        return {
+            "partial": False,
+            "failed_cells": 0,
+            "origin_addresses": origins,
+            "destination_addresses": destinations,
+            "rows": [{"elements": [{"status": "ZERO_RESULTS"}]}],
+        }
+    
+    monkeypatch.setattr(google_maps, "lookup_distance_matrix", lookup)
+    result = asyncio.run(google_maps.calculate_distance_matrix(["A"], ["B"], output_format="csv"))
+    assert result == "origin,B\nA,ZERO_RESULTS\n"
+    payload = json.loads(asyncio.run(google_maps.calculate_distance_matrix(["A"], ["B"], output_format="json")))
+    assert payload["rows"] == [[{"status": "ZERO_RESULTS"}]]
@@ -0,0 +1,53 @@
+import asyncio
+import json
+
+import httpx
+
+import google_maps
+
+def slow_geocoder(delays: dict[str, float], finished: list[str]):
+    async def handle(request: httpx.Request) -> httpx.Response:
+        address = request.url.params["address"]
+        await asyncio.sleep(delays.get(address, 0))
+        finished.append(address)
+        result = {"formatted_address": address, "geometry": {"location": {"lat": 1.0, "lng": 2.0}}, "place_id": address}
+        return httpx.Response(200, json={"status": "OK", "results": [result]})
+    
+    return handle
+
+def run_batch_geocode(handler, addresses: list[str], timeout: float, linger: float = 0.0) -> dict:
+    async def run() -> dict:
+        google_maps._geocode_cache.clear()
+        google_maps._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            result = await google_maps.batch_geocode(addresses, timeout=timeout, output_format="json")
+            # Give abandoned upstream requests time to finish if they were not cancelled
+            await asyncio.sleep(linger)
+            return json.loads(result)
+        finally:
+            await google_maps.close_http_client()
+    
+    return asyncio.run(run())
+
+def test_timeout_marks_unfinished_items_pending():
+    finished: list[str] = []
+    handler = slow_geocoder({"slow": 5.0}, finished)
+    payload = run_batch_geocode(handler, ["fast", "slow"], timeout=0.2)
+    fast, slow = payload["results"]
+    assert payload["partial"] is True
+    assert fast["address"] == "fast"
+    assert slow == {"query": "slow", "status": "pending"}
+
+def test_timeout_cancels_abandoned_upstream_requests():
+    finished: list[str] = []
+    handler = slow_geocoder({f"slow {i}": 0.5 for i in range(5)}, finished)
+    payload = run_batch_geocode(handler, [f"slow {i}" for i in range(5)], timeout=0.1, linger=0.8)
+    assert all(entry["status"] == "pending" for entry in payload["results"])
+    assert finished == []
+    assert not google_maps._inflight
+
+def test_zero_timeout_is_a_timeout():
+    finished: list[str] = []
+    handler = slow_geocoder({"slow": 0.2}, finished)
+    payload = run_batch_geocode(handler, ["slow"], timeout=0)
+    assert payload["results"] == [{"query": "slow", "status": "pending"}]
@@ -0,0 +1,53 @@
+import asyncio
+
+import httpx
+
+import google_maps
+
+PREFETCH_HITS = ("google_maps_details_prefetch_total", {"result": "hits"})
+
+def test_call_joining_a_running_prefetch_counts_as_hit(monkeypatch):
+    monkeypatch.setattr(google_maps, "DETAILS_PREFETCH_TOP_K", 5)
+    calls: list[str] = []
+    
+    async def handle(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.params["place_id"])
+        await asyncio.sleep(0.1)
+        return httpx.Response(200, json={"status": "OK", "result": {"name": "Prefetched"}})
+    
+    async def run() -> dict | None:
+        google_maps._place_details_cache.clear()
+        google_maps._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+        try:
+            google_maps.prefetch_place_details(["place-1"])
+            await asyncio.sleep(0.02)
+            return await google_maps.place_details("place-1")
+        finally:
+            await google_maps.close_http_client()
+    
+    hits = google_maps.metrics.value(*PREFETCH_HITS)
+    assert asyncio.run(run()) == {"name": "Prefetched"}
+    assert calls == ["place-1"]
+    assert google_maps.metrics.value(*PREFETCH_HITS) == hits + 1
+
+def test_expired_prefetch_is_not_a_hit(monkeypatch):
+    monkeypatch.setattr(google_maps, "DETAILS_PREFETCH_TOP_K", 5)
+    
+    def handle(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"status": "OK", "result": {"name": "Prefetched"}})
+    
+    async def run() -> None:
+        google_maps._place_details_cache.clear()
+        google_maps._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+        try:
+            google_maps.prefetch_place_details(["place-2"])
+            await asyncio.sleep(0.02)
+            # The prefetched result was evicted before it was used
+            google_maps._place_details_cache.clear()
+            await google_maps.place_details("place-2")
+        finally:
+            await google_maps.close_http_client()
+    
+    hits = google_maps.metrics.value(*PREFETCH_HITS)
+    asyncio.run(run())
+    assert google_maps.metrics.value(*PREFETCH_HITS) == hits
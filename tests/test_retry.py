@@ -0,0 +1,110 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+import google_maps
+
+@pytest.fixture
+def upstream():
+    """Route upstream requests to a handler set by the test."""
+    def install(handler):
+        google_maps._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    
+    yield install
+    google_maps._http_client = None
+
+def test_rate_limiter_wait_does_not_use_the_call_retry_budget(upstream, monkeypatch):
+    """Requests queued on the limiter past RETRY_MAX_ELAPSED must still be retried."""
+    monkeypatch.setattr(google_maps, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setitem(google_maps.ENDPOINT_RATE_LIMITS, "geocode/json", (10.0, None))
+    monkeypatch.setattr(google_maps, "_request_buckets", {})
+    monkeypatch.setattr(google_maps, "RETRY_MAX_ELAPSED", 0.3)
+    google_maps._geocode_cache.clear()
+    seen = set()
+    
+    def handle(request: httpx.Request) -> httpx.Response:
+        address = request.url.params["address"]
+        if address not in seen:
+            seen.add(address)
+            return httpx.Response(200, json={"status": "OVER_QUERY_LIMIT"})
+        result = {"formatted_address": address, "geometry": {"location": {"lat": 1.0, "lng": 2.0}}, "place_id": address}
+        return httpx.Response(200, json={"status": "OK", "results": [result]})
+    
+    upstream(handle)
+    # 24 requests at 10/s keep the later ones queued for over a second
+    result = asyncio.run(google_maps.batch_geocode([f"{i} Retry Street" for i in range(12)], output_format="json"))
+    assert "Unable to geocode" not in result
+
+def fetch(endpoint: str = "geocode/json", params: dict | None = None):
+    return asyncio.run(google_maps._fetch_google(endpoint, dict(params or {"address": "1 Main Street"})))
+
+def sequence(*responses):
+    """Handler answering with the given responses in order, recording each request."""
+    requests = []
+    
+    def handle(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        response = responses[min(len(requests), len(responses)) - 1]
+        if isinstance(response, Exception):
+            raise response
+        return response
+    
+    handle.requests = requests
+    return handle
+
+OK = httpx.Response(200, json={"status": "OK", "results": []})
+
+@pytest.mark.parametrize("response", [
+    httpx.Response(200, json={"status": "OVER_QUERY_LIMIT"}),
+    httpx.Response(200, json={"status": "UNKNOWN_ERROR"}),
+    httpx.Response(429),
+    httpx.Response(503),
+    httpx.ConnectError("connection refused"),
+])
+def test_retries_transient_failures(upstream, response):
+    handle = sequence(response, OK)
+    upstream(handle)
+    assert fetch() == {"status": "OK", "results": []}
+    assert len(handle.requests) == 2
+
+@pytest.mark.parametrize("response", [
+    httpx.Response(200, json={"status": "ZERO_RESULTS", "results": []}),
+    httpx.Response(200, json={"status": "REQUEST_DENIED", "error_message": "denied"}),
+    httpx.Response(400),
+    httpx.Response(404),
+])
+def test_does_not_retry_permanent_failures(upstream, response):
+    handle = sequence(response, OK)
+    upstream(handle)
+    assert fetch() is None
+    assert len(handle.requests) == 1
+
+def test_waits_for_retry_after(upstream):
+    handle = sequence(httpx.Response(503, headers={"Retry-After": "0.2"}), OK)
+    upstream(handle)
+    started = time.monotonic()
+    assert fetch() is not None
+    assert time.monotonic() - started >= 0.2
+
+def test_gives_up_after_max_attempts(upstream, monkeypatch):
+    monkeypatch.setattr(google_maps, "RETRY_MAX_ATTEMPTS", 3)
+    handle = sequence(httpx.Response(503))
+    upstream(handle)
+    assert fetch() is None
+    assert len(handle.requests) == 3
+
+def test_gives_up_when_retry_after_exceeds_max_elapsed(upstream, monkeypatch):
+    monkeypatch.setattr(google_maps, "RETRY_MAX_ELAPSED", 1.0)
+    handle = sequence(httpx.Response(503, headers={"Retry-After": "30"}), OK)
+    upstream(handle)
+    assert fetch() is None
+    assert len(handle.requests) == 1
+
+def test_parse_retry_after():
+    assert google_maps.parse_retry_after("1.5") == 1.5
+    assert google_maps.parse_retry_after("-3") == 0.0
+    assert google_maps.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert google_maps.parse_retry_after("soon") is None
+    assert google_maps.parse_retry_after(None) is None
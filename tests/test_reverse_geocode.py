@@ -0,0 +1,60 @@
+import asyncio
+import json
+
+import httpx
+
+import google_maps
+from google_maps import GridCache, SpatialGrid
+
+def test_grid_cache_hits_within_tolerance():
+    cache = GridCache(cell_size=10, max_entries=100, max_bytes=1024 * 1024, ttl=60)
+    cache.set(37.7749, -122.4194, "sf")
+    # About 5.5 m north
+    assert cache.get(37.77495, -122.4194) == "sf"
+    # About 110 m north
+    assert cache.get(37.7759, -122.4194) is None
+
+def test_grid_cache_hits_across_cell_boundaries():
+    cache = GridCache(cell_size=10, max_entries=100, max_bytes=1024 * 1024, ttl=60)
+    step = cache._lat_step
+    cache.set(step * 1000 - step / 10, 0.0, "below")
+    assert cache.get(step * 1000 + step / 10, 0.0) == "below"
+
+def test_grid_cache_returns_nearest_point():
+    cache = GridCache(cell_size=10, max_entries=100, max_bytes=1024 * 1024, ttl=60)
+    cache.set(51.5, 0.0, "far")
+    cache.set(51.50005, 0.0, "near")
+    assert cache.get(51.50006, 0.0) == "near"
+
+def test_grid_cache_at_high_latitude():
+    cache = GridCache(cell_size=10, max_entries=100, max_bytes=1024 * 1024, ttl=60)
+    cache.set(78.2232, 15.6267, "svalbard")
+    # About 8 m east, a larger longitude step this far north
+    assert cache.get(78.2232, 15.6267 + 0.00035) == "svalbard"
+    assert cache.get(78.2232, 15.6267 + 0.001) is None
+
+def test_batch_clusters_against_every_earlier_point_in_a_cell(monkeypatch):
+    monkeypatch.setattr(google_maps, "REVERSE_GEOCODE_TOLERANCE", 10.0)
+    step = SpatialGrid(10.0)._lat_step
+    # a and b share a cell but are about 12.5 m apart; c is 3 m from a and 13 m from b
+    a = {"lat": 0.1 * step, "lng": 0.1 * step}
+    b = {"lat": 0.9 * step, "lng": 0.9 * step}
+    c = {"lat": -0.2 * step, "lng": 0.1 * step}
+    calls: list[str] = []
+    
+    def handle(request: httpx.Request) -> httpx.Response:
+        latlng = request.url.params["latlng"]
+        calls.append(latlng)
+        return httpx.Response(200, json={"status": "OK", "results": [{"formatted_address": latlng, "place_id": latlng}]})
+    
+    async def run() -> dict:
+        google_maps._reverse_geocode_cache.clear()
+        google_maps._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+        try:
+            return json.loads(await google_maps.batch_reverse_geocode([a, b, c], output_format="json"))
+        finally:
+            await google_maps.close_http_client()
+    
+    results = asyncio.run(run())["results"]
+    assert len(calls) == 2
+    assert results[2]["address"] == results[0]["address"] != results[1]["address"]
@@ -0,0 +1,64 @@
+import asyncio
+import base64
+import json
+
+import httpx
+import pytest
+
+import google_maps
+from google_maps import decode_cursor, encode_cursor
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor("token", 7)) == ("token", 7)
+    assert decode_cursor(encode_cursor(None, 0)) == (None, 0)
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    "bm90IGpzb24=",  # "not json"
+    encode_cursor("token", 1)[:-4],
+    encode_cursor(None, -1),
+    encode_cursor(3, 0),  # type: ignore[arg-type]
+    encode_cursor("token", "1"),  # type: ignore[arg-type]
+])
+def test_decode_cursor_rejects_invalid(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+def test_decode_cursor_rejects_wrong_shape():
+    cursor = base64.urlsafe_b64encode(json.dumps(["token", 1, 2]).encode()).decode()
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+def test_default_limit_paging_prefetches_next_page():
+    """Default-limit paging must start fetching the second page before the call that needs it."""
+    tokens: list[str | None] = []
+    
+    def handle(request: httpx.Request) -> httpx.Response:
+        token = request.url.params.get("pagetoken")
+        tokens.append(token)
+        page = int(token[1:]) if token else 0
+        body = {
+            "status": "OK",
+            "results": [{"name": f"Place {page * 20 + i}", "place_id": f"place-{page * 20 + i}"} for i in range(20)],
+        }
+        if page < 2:
+            body["next_page_token"] = f"t{page + 1}"
+        return httpx.Response(200, json=body)
+    
+    async def run() -> None:
+        google_maps._search_page_cache.clear()
+        google_maps._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+        try:
+            cursor = None
+            for call in range(1, 5):
+                if call == 4:
+                    assert "t1" in tokens, f"page t1 was not prefetched before call 4 (requests: {tokens})"
+                payload = json.loads(await google_maps.search_places("paging check", cursor=cursor, output_format="json"))
+                cursor = payload["next_cursor"]
+                # Let the background prefetch send its request
+                await asyncio.sleep(0.05)
+        finally:
+            await google_maps.close_http_client()
+    
+    asyncio.run(run())
+    assert tokens.count("t1") == 1, f"page t1 was requested {tokens.count('t1')} times (requests: {tokens})"